@@ -1,17 +1,20 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 from auth import Auth
 from database import Database
 from model import Model
-from optimizer import Optimizer
-from report_generator import ReportGenerator
+from ingest import fill_fatigue, import_csv, standardize_columns
+from src.advanced_optimizer import run_policy_grid
+from jobs import JobQueue, ACTIVE
+from io import BytesIO
 
 # --- INIT ---
-db = Database()
+# Parquet snapshots speed up dashboard reads when pyarrow is installed
+db = Database(snapshot_dir="data/snapshots")
 ai = Model()
-opt = Optimizer()
-rep = ReportGenerator()
+jobs = JobQueue(db)
 Auth.init_session()
 
 # --- THEME & UI ---
@@ -31,40 +34,64 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- UTILITY ---
-def standardize_columns(df):
-    if df.empty: return df
-    df.columns = [str(c).strip().lower().replace(' ', '_') for c in df.columns]
-    mapping = {
-        'employee_id': 'Employee_ID', 'age': 'Age', 'gender': 'Gender', 
-        'department': 'Department', 'shift_type': 'Shift_Type', 
-        'daily_wages': 'Daily_Wages', 'overtime_hours': 'Overtime_Hours', 
-        'distance_km': 'Distance_km', 'years_of_service': 'Years_of_Service', 
-        'last_month_leave': 'Last_Month_Leave', 'satisfaction': 'Satisfaction',
-        'fatigue_score': 'Fatigue_Score', 'attrition': 'Attrition',
-        'ot_trend': 'OT_Trend', 'leave_trend': 'Leave_Trend'
-    }
-    df = df.rename(columns={c: mapping[c] for c in df.columns if c in mapping})
-    defaults = {
-        'Employee_ID': 'Unknown', 'Age': 30, 'Gender': 'Male', 'Department': 'Production',
-        'Shift_Type': 'Morning', 'Daily_Wages': 500, 'Overtime_Hours': 0, 'Distance_km': 5,
-        'Years_of_Service': 1, 'Last_Month_Leave': 0, 'Satisfaction': 3,
-        'OT_Trend': 'Stable', 'Leave_Trend': 'Stable'
-    }
-    for col, val in defaults.items():
-        if col not in df.columns: df[col] = val
-        else: df[col] = df[col].fillna(val)
-    return df
-
 def ensure_fatigue(df):
+    # Standardize first, so a scoring failure still leaves the app's column names
     df = standardize_columns(df)
-    if df.empty: return df
-    if 'Fatigue_Score' in df.columns: return df
     try:
-        df['Fatigue_Score'] = df.apply(opt.calculate_fatigue, axis=1)
+        df = fill_fatigue(df)
     except Exception as e:
         st.error(f"Fatigue calculation error: {e}")
     return df
 
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_workforce(version):
+    # Keyed on the employees table version, so reruns and other sessions share it
+    return ensure_fatigue(db.get_employees())
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def load_overview(emp_version, pred_version):
+    # Pre-binned in SQL; charts never receive per-employee rows
+    return db.overview_summary()
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def simulate_policies(version, wage_mods, ot_mods):
+    return run_policy_grid(ai, load_workforce(version), wage_mods, ot_mods)
+
+def paged_table(container, key, fetch, total, filters, page_size=50):
+    """Keyset-paged table: fetch(after, limit) -> (page, next cursor). Cursors reset when filters change."""
+    state = st.session_state.setdefault(key, {'filters': None, 'cursors': [None]})
+    if state['filters'] != filters:
+        state.update(filters=filters, cursors=[None])
+    page, next_cursor = fetch(state['cursors'][-1], page_size)
+    container.dataframe(page, use_container_width=True)
+
+    page_no = len(state['cursors'])
+    p1, p2, p3 = container.columns([1, 3, 1])
+    p2.caption(f"Page {page_no} of {max(1, -(-total // page_size))} | {total:,} rows")
+    # Callbacks run before the next script run, so the new page renders immediately
+    p1.button("◀ Prev", key=f"{key}_prev", disabled=page_no == 1, on_click=state['cursors'].pop)
+    p3.button("Next ▶", key=f"{key}_next", disabled=next_cursor is None,
+              on_click=state['cursors'].append, args=(next_cursor,))
+
+@st.fragment(run_every=2)
+def job_status(key):
+    """Live progress for the job id stored under session key; reruns the page once it finishes."""
+    job_id = st.session_state.get(key)
+    job = jobs.get(job_id) if job_id else None
+    if job is None: return
+    if job['status'] in ACTIVE:
+        st.progress(job['progress'], text=f"{job['kind'].replace('_', ' ').title()}: {job['message'] or job['status']}")
+    elif st.session_state.get(f"{key}_rendered") != job_id:
+        st.session_state[f"{key}_rendered"] = job_id
+        st.rerun(scope="app")
+    elif job['status'] == 'failed':
+        st.error(f"Job #{job_id} failed: {job['error']}")
+
+def finished_job(key):
+    job_id = st.session_state.get(key)
+    job = jobs.get(job_id) if job_id else None
+    return job if job and job['status'] == 'done' else None
+
 # --- PAGES ---
 def login_view():
     # ... (rest of function)
@@ -93,73 +120,149 @@ def dashboard_view():
     st.sidebar.title("🛡️ ShiftSync AI")
     st.sidebar.markdown(f"**Role:** {st.session_state.user_role}")
     st.sidebar.write("---")
-    menu = st.sidebar.selectbox("Navigation", ["Overview", "Risk Analytics", "Optimization", "Data Management", "Ask Minion"])
+    menu = st.sidebar.selectbox("Navigation", ["Overview", "Risk Analytics", "Optimization", "Policy Simulator", "Data Management", "Ask Minion"])
     if st.sidebar.button("Logout"): Auth.logout()
 
-    df = db.get_employees()
-    df = ensure_fatigue(df)
+    versions = db.get_versions()
+    # Overview and Data Management read summaries and pages, not the full frame
+    df = load_workforce(versions['employees']) if menu not in ("Overview", "Data Management") else None
     
     if menu == "Overview":
         st.title("Workforce Overview")
-        if df.empty:
+        summary = load_overview(versions['employees'], versions['predictions'])
+        metrics = summary['metrics']
+        if not metrics['headcount']:
             st.warning("No data found. Please upload a CSV in Data Management.")
         else:
             m1, m2, m3 = st.columns(3)
-            m1.metric("Strength", len(df))
-            m2.metric("Avg Fatigue", f"{df['Fatigue_Score'].mean():.1f}")
-            m3.metric("Critical Nodes", len(df[df['Fatigue_Score'] > 75]))
+            m1.metric("Strength", metrics['headcount'])
+            m2.metric("Avg Fatigue", f"{metrics['avg_fatigue']:.1f}")
+            m3.metric("Critical Nodes", metrics['critical'])
             
             st.divider()
             c1, c2 = st.columns(2)
-            fig1 = px.histogram(df, x="Department", color="Shift_Type", barmode="group", title="Department Distribution")
+            fig1 = px.bar(summary['dept_shift'], x="Department", y="Employees", color="Shift_Type",
+                          barmode="group", title="Department Distribution")
             c1.plotly_chart(fig1, use_container_width=True)
             
-            fig2 = px.scatter(df, x="Overtime_Hours", y="Fatigue_Score", color="Attrition", title="Overtime vs Fatigue")
+            # One bubble per (OT, fatigue) cell, coloured by high-risk share once predictions exist
+            density = summary['ot_fatigue']
+            scored = density['High_Risk_Share'].notna().any()
+            fig2 = px.scatter(density, x="OT_Bin", y="Fatigue_Bin", size="Employees",
+                              color="High_Risk_Share" if scored else None,
+                              color_continuous_scale="Reds", title="Overtime vs Fatigue",
+                              labels={'OT_Bin': 'Overtime_Hours', 'Fatigue_Bin': 'Fatigue_Score'})
             c2.plotly_chart(fig2, use_container_width=True)
 
+            fig3 = px.bar(summary['fatigue_hist'], x="Fatigue_Bin", y="Employees", title="Fatigue Distribution",
+                          labels={'Fatigue_Bin': 'Fatigue_Score'})
+            st.plotly_chart(fig3, use_container_width=True)
+
     elif menu == "Risk Analytics":
         st.title("AI Attrition Risk Analytics")
         if not df.empty:
+            incremental = st.checkbox("Only re-score employees whose data changed", value=True)
             if st.button("Run AI Risk Assessment"):
-                preds = ai.predict_attrition(df)
-                db.save_predictions(preds)
-                st.success("Risk patterns identified.")
+                # Scored chunks stream into the predictions table from a background worker
+                st.session_state['risk_job'] = jobs.submit('risk_assessment', {'incremental': incremental})
+            job_status('risk_job')
+            done = finished_job('risk_job')
+            if done:
+                st.success(f"Risk patterns identified. {done['result']['scored']} employees scored.")
                 
             # Load Predictions
             try:
-                conn = db.get_connection()
-                preds_db = pd.read_sql("SELECT * FROM predictions", conn)
-                conn.close()
+                counts = db.risk_counts()
+                if counts.empty: raise ValueError("no predictions")
                 
                 c1, c2 = st.columns([1, 2])
-                fig_risk = px.pie(preds_db, names="Attrition_Risk", color="Attrition_Risk", 
+                fig_risk = px.pie(counts, names="Attrition_Risk", values="Employees", color="Attrition_Risk", 
                                  color_discrete_map={"High":"#ef4444", "Medium":"#f59e0b", "Low":"#10b981"})
                 c1.plotly_chart(fig_risk, use_container_width=True)
                 
                 c2.write("### Risk Registry")
-                c2.dataframe(preds_db.sort_values('Probability', ascending=False), use_container_width=True)
+                groups = load_overview(versions['employees'], versions['predictions'])['dept_shift']
+                f1, f2, f3 = c2.columns(3)
+                filters = {
+                    'Attrition_Risk': f1.multiselect("Risk", ["High", "Medium", "Low"]),
+                    'Department': f2.multiselect("Department", sorted(groups['Department'].dropna().unique())),
+                    'Shift_Type': f3.multiselect("Shift", sorted(groups['Shift_Type'].dropna().unique())),
+                }
+                paged_table(c2, "registry_pages", lambda after, limit: db.page_predictions(filters, after, limit),
+                            db.count_predictions(filters), filters)
             except:
                 st.info("Run assessment to view results.")
 
     elif menu == "Optimization":
         st.title("Fatigue-Aware Roster Optimization")
         if not df.empty:
-            try:
-                conn = db.get_connection()
-                preds_db = pd.read_sql("SELECT * FROM predictions", conn)
-                conn.close()
-                
-                if st.button("Generate Optimized Roster"):
-                    optimized_df = opt.run_optimization(df, preds_db)
+            if not db.count_predictions():
+                st.error("Please run Risk Assessment first.")
+            else:
+                engine = st.radio("Engine", ["Rule-based", "Coverage-aware solver (LP/MIP)"], horizontal=True)
+                params = {'engine': 'rule' if engine == "Rule-based" else 'solver'}
+                b1, b2 = st.columns(2)
+                if b1.button("Generate Optimized Roster"):
+                    st.session_state['roster_job'] = jobs.submit('optimize', params)
+                if b2.button("Export Final PDF Report"):
+                    st.session_state['report_job'] = jobs.submit('report', params)
+                job_status('roster_job')
+                job_status('report_job')
+
+                report_job = finished_job('report_job')
+                if report_job:
+                    st.download_button("Download Official Report", jobs.artifact_bytes(report_job['id']),
+                                       "ShiftSync_Report.pdf", mime="application/pdf")
+
+                roster_job = finished_job('roster_job')
+                if roster_job:
+                    result = roster_job['result']
+                    if result.get('solver_report'):
+                        st.dataframe(pd.DataFrame(result['solver_report']), use_container_width=True)
+                    if result['unmatched']:
+                        st.warning(f"{result['unmatched']} employees have no risk prediction. Re-run Risk Assessment to include them.")
+                    if result['stale']:
+                        st.info(f"{result['stale']} stale predictions ignored (employees no longer on the roster).")
+                    optimized_df = pd.read_csv(BytesIO(jobs.artifact_bytes(roster_job['id'])))
                     st.write("### AI Recommended Shift Adjustments")
                     st.dataframe(optimized_df[optimized_df['Action'] != 'Maintained'], use_container_width=True)
-                    
-                    if st.button("Export Final PDF Report"):
-                        path = rep.generate_pdf(df, preds_db, optimized_df)
-                        with open(path, "rb") as f:
-                            st.download_button("Download Official Report", f, "ShiftSync_Report.pdf")
-            except:
-                st.error("Please run Risk Assessment first.")
+
+            with st.expander("Background Jobs"):
+                # Finished artifacts are shared: any session can download them
+                recent = jobs.recent()
+                st.dataframe(recent, use_container_width=True, hide_index=True)
+                ready = recent[recent['status'].eq('done') & recent['artifact'].notna()]
+                if not ready.empty:
+                    pick = st.selectbox("Artifact", ready['id'], format_func=lambda i: f"#{i} {ready.set_index('id').loc[i, 'artifact']}")
+                    name = ready.set_index('id').loc[pick, 'artifact']
+                    st.download_button("Download Artifact", jobs.artifact_bytes(pick), name, key="artifact_download")
+
+    elif menu == "Policy Simulator":
+        st.title("Wage & Overtime Policy Simulator")
+        if df.empty:
+            st.warning("No data found. Please upload a CSV in Data Management.")
+        else:
+            c1, c2 = st.columns(2)
+            wage_lo, wage_hi = c1.slider("Daily wage adjustment (₹)", -300, 500, (-100, 300), step=25)
+            wage_steps = c1.slider("Wage steps", 2, 20, 10)
+            ot_lo, ot_hi = c2.slider("Overtime adjustment (h)", -20, 20, (-8, 8))
+            ot_steps = c2.slider("OT steps", 2, 20, 10)
+
+            wage_mods = tuple(np.linspace(wage_lo, wage_hi, wage_steps).round(1))
+            ot_mods = tuple(np.linspace(ot_lo, ot_hi, ot_steps).round(1))
+            st.caption(f"{len(wage_mods) * len(ot_mods)} scenarios x {len(df):,} employees")
+
+            if st.button("Run Simulation"):
+                with st.spinner("Scoring policy scenarios..."):
+                    grid = simulate_policies(versions['employees'], wage_mods, ot_mods)
+                heat = grid.pivot(index='OT_Adjustment', columns='Wage_Adjustment', values='Avg_Risk')
+                fig = px.imshow(heat, origin='lower', aspect='auto', color_continuous_scale='RdYlGn_r',
+                                labels={'x': 'Wage Adjustment (₹/day)', 'y': 'OT Adjustment (h)', 'color': 'Avg Risk'},
+                                title="Average Attrition Risk by Policy")
+                st.plotly_chart(fig, use_container_width=True)
+                best = grid.sort_values('Avg_Risk').iloc[0]
+                st.success(f"Lowest risk: wage {best['Wage_Adjustment']:+.0f}, OT {best['OT_Adjustment']:+.1f}h "
+                           f"-> avg risk {best['Avg_Risk']:.3f}, {int(best['High_Risk_Count'])} high-risk employees")
 
     elif menu == "Data Management":
         st.title("System Data Management")
@@ -169,12 +272,18 @@ def dashboard_view():
         with col_up1:
             up = st.file_uploader("Upload Employee Records (CSV - Max 1GB)", type="csv")
             if up:
-                up_df = pd.read_csv(up)
+                st.caption(f"{up.name} | {up.size / 1e6:.1f} MB")
                 if st.button("Commit to Database (Merge)"):
-                    with st.spinner("Merging data..."):
-                        up_df = ensure_fatigue(up_df)
-                        db.save_employees(up_df)
-                        st.success(f"Added {len(up_df)} records!")
+                    bar = st.progress(0.0, text="Merging data...")
+                    try:
+                        stats = import_csv(up, db, on_progress=lambda frac, t: bar.progress(
+                            frac, text=f"Merging data... {t['rows']:,} rows committed"))
+                    except Exception as e:
+                        st.error(f"Import stopped: {e}")
+                    else:
+                        bar.progress(1.0, text="Refreshing columnar snapshot...")
+                        db.snapshot_employees()
+                        st.success(f"Added {stats['inserted']} new, updated {stats['updated']}, unchanged {stats['unchanged']} records!")
                         st.rerun()
         
         with col_up2:
@@ -186,8 +295,9 @@ def dashboard_view():
         
         st.divider()
         st.write("### Active Records")
-        st.write(f"Total Rows: **{len(df)}**")
-        st.dataframe(df.head(50), use_container_width=True)
+        total = db.count_employees()
+        st.write(f"Total Rows: **{total}**")
+        paged_table(st, "records_pages", lambda after, limit: db.page_employees(after=after, limit=limit), total, None)
 
     elif menu == "Ask Minion":
         st.title("🤖 Ask Minion")
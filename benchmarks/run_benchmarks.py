@@ -0,0 +1,164 @@
+"""
+ShiftSync Benchmark Suite.
+Generates synthetic workforces into a temp directory and times the hot paths
+of the app end to end:
+
+    score_fatigue         (what app.ensure_fatigue runs on every load)
+    predict_attrition     (Model)
+    run_optimization      (Optimizer)
+    save_employees        (Database, into an empty table)
+    get_employees         (Database)
+    generate_pdf          (ReportGenerator)
+
+Each stage reports its best wall time over --repeat runs and, in a separate
+tracemalloc pass (tracing slows the code it measures), its peak Python heap.
+Results are written as a JSON baseline; pass --compare to diff against an
+older one and exit non-zero on regressions.
+
+    python benchmarks/run_benchmarks.py --sizes 10000,100000 --output benchmarks/baselines/local.json
+    python benchmarks/run_benchmarks.py --sizes 10000 --compare benchmarks/baselines/local.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: only the per-stage tracemalloc peaks are reported
+    resource = None
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from advanced_data_gen import generate_advanced_data
+from database import Database
+from ingest import score_fatigue
+from model import Model
+from optimizer import Optimizer
+from report_generator import ReportGenerator
+
+def measure(fn, repeat=3, memory=True):
+    """Best-of-N wall time, plus peak traced allocation from one extra run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, {'seconds': round(min(times), 4), 'peak_mb': None if peak is None else round(peak / 2**20, 2)}
+
+def run_size(n, workdir, repeat=3, memory=True, seed=123):
+    csv_path = os.path.join(workdir, f'workforce_{n}.csv')
+    start = time.perf_counter()
+    generate_advanced_data(n, seed=seed, output_path=csv_path)
+    df = pd.read_csv(csv_path)
+    results = {'generate': {'seconds': round(time.perf_counter() - start, 4), 'peak_mb': None}}
+
+    ai = Model(os.path.join(ROOT, 'src'))
+    ai.load_artifacts()
+    raw = df.drop(columns=['Fatigue_Score'])
+    db = Database(os.path.join(workdir, f'bench_{n}.db'))
+
+    def save():
+        db.clear_employees()
+        db.save_employees(df)
+
+    _, results['score_fatigue'] = measure(lambda: score_fatigue(raw.copy()), repeat, memory)
+    predictions, results['predict_attrition'] = measure(lambda: ai.predict_attrition(df), repeat, memory)
+    optimized, results['run_optimization'] = measure(lambda: Optimizer.run_optimization(df, predictions), repeat, memory)
+    _, results['save_employees'] = measure(save, repeat, memory)
+    _, results['get_employees'] = measure(db.get_employees, repeat, memory)
+
+    pdf_path = os.path.join(workdir, f'report_{n}.pdf')
+    _, results['generate_pdf'] = measure(
+        lambda: ReportGenerator().generate_pdf(df, predictions, optimized, output_path=pdf_path), repeat, memory)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except Exception:
+        return None
+
+def compare(current, baseline, threshold):
+    """Prints per-stage ratios; returns the list of (size, stage) that slowed down past threshold."""
+    regressions = []
+    print(f"\n{'rows':>9} {'stage':<18} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for size, stages in current['results'].items():
+        for stage, cur in stages.items():
+            old = baseline['results'].get(size, {}).get(stage)
+            if not old or not old['seconds']:
+                continue
+            ratio = cur['seconds'] / old['seconds']
+            flag = ' <-- regression' if ratio > 1 + threshold else ''
+            print(f"{size:>9} {stage:<18} {old['seconds']:>10.4f} {cur['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+            if flag:
+                regressions.append((size, stage))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ShiftSync performance benchmarks")
+    parser.add_argument('--sizes', default='10000,100000,1000000', help="Comma-separated workforce sizes")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage (best is kept)")
+    parser.add_argument('--seed', type=int, default=123)
+    parser.add_argument('--no-memory', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2, help="Allowed slowdown before failing (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    report = {
+        'commit': git_commit(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeat': args.repeat,
+        'results': {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix='shiftsync_bench_') as workdir:
+        for n in sizes:
+            print(f"Benchmarking {n:,} employees...")
+            report['results'][str(n)] = run_size(n, workdir, args.repeat, not args.no_memory, args.seed)
+            for stage, r in report['results'][str(n)].items():
+                peak = '' if r['peak_mb'] is None else f"  peak {r['peak_mb']:.1f} MB"
+                print(f"  {stage:<18} {r['seconds']:>9.4f}s{peak}")
+    if resource is not None:
+        # ru_maxrss is KiB on Linux (bytes on macOS)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report['max_rss_mb'] = round(rss / 2**20 if sys.platform == 'darwin' else rss / 1024, 1)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) regressed by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+ShiftSync Headless Batch Runner.
+Runs the nightly pipeline without Streamlit:
+
+    ingest (optional CSV) -> load -> fatigue -> score -> optimize -> [rotation] -> report
+
+    python cli.py --csv data/advanced_hr_data.csv --chunk-size 50000 --workers 4
+    python cli.py --db data/shiftsync_v2.db --engine solver --report reports/nightly.pdf
+    python cli.py --rotation reports/rotation.csv --weeks 6 --no-report
+
+Every stage prints its wall time and the process peak RSS so far (where the
+platform reports it; not on Windows); --json writes the same numbers for
+monitoring. Exit codes: 0 success, 1 a stage failed, 3 no employees to
+process (2 is argparse's usage error).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from datetime import date
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+EXIT_OK, EXIT_FAILED, EXIT_EMPTY = 0, 1, 3
+
+class StageFailed(Exception):
+    pass
+
+def peak_rss_mb():
+    """Peak resident memory of this process so far, or None if the platform doesn't report it."""
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux (bytes on macOS)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / 2**20 if sys.platform == 'darwin' else rss / 1024, 1)
+
+class Pipeline:
+    """Times each stage and records peak memory; stops at the first failure."""
+
+    def __init__(self):
+        self.stages = []
+
+    def run(self, name, fn, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            traceback.print_exc()
+            self._record(name, start, 'failed', error=f"{type(e).__name__}: {e}")
+            raise StageFailed(name) from e
+        self._record(name, start, 'ok')
+        return result
+
+    def _record(self, name, start, status, **extra):
+        stage = {'stage': name, 'status': status, 'seconds': round(time.perf_counter() - start, 3),
+                 'peak_rss_mb': peak_rss_mb(), **extra}
+        self.stages.append(stage)
+        peak = '' if stage['peak_rss_mb'] is None else f"  peak RSS {stage['peak_rss_mb']:>8.1f} MB"
+        print(f"[{status:>6}] {name:<10} {stage['seconds']:>9.3f}s{peak}", flush=True)
+
+def score_full(ai, db, df, **batch):
+    # Scored chunks go to a staging table and replace the live predictions only
+    # once every chunk succeeded
+    staging = db.stage_predictions()
+    try:
+        scored = ai.predict_attrition_batched(
+            df, with_hash=True, on_chunk=lambda chunk: db.save_predictions(chunk, mode="stage", staging=staging),
+            **batch)
+        if scored is None:
+            raise RuntimeError("model returned no predictions")
+        db.publish_predictions(staging)
+    except Exception:
+        db.discard_staged_predictions(staging)
+        raise
+    return scored
+
+def score_incremental(ai, db, df, state, **batch):
+    scored = ai.predict_incremental(df, state, on_chunk=lambda chunk: db.save_predictions(chunk, mode="upsert"),
+                                    **batch)
+    if scored is None:
+        raise RuntimeError("model returned no predictions")
+    return scored
+
+def plan_rotation(df, predictions, weeks, path):
+    from scheduler import RotatingScheduler
+    plan = RotatingScheduler(df, predictions, weeks=weeks).plan()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    plan.to_frame().to_csv(path, index=False)
+    return plan.solver_report()
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless ShiftSync scoring, optimization and reporting")
+    parser.add_argument('--db', default=os.path.join(ROOT, 'data', 'shiftsync_v2.db'), help="SQLite database")
+    parser.add_argument('--csv', help="Import this CSV (upsert) before running")
+    parser.add_argument('--analyze', action='store_true', help="Refresh SQLite planner statistics after the import")
+    parser.add_argument('--model-dir', default=os.path.join(ROOT, 'src'))
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows per import/scoring chunk")
+    parser.add_argument('--workers', type=int, default=None, help="Scoring workers (default: all cores)")
+    parser.add_argument('--executor', choices=['thread', 'process'], default='thread')
+    parser.add_argument('--incremental', action='store_true', help="Only re-score employees whose data changed")
+    parser.add_argument('--engine', choices=['rule', 'solver'], default='rule')
+    parser.add_argument('--roster', help="Write the optimized roster CSV here")
+    parser.add_argument('--rotation', help="Plan a multi-week rotating roster and write it as CSV here")
+    parser.add_argument('--weeks', type=int, default=4, help="Weeks in the --rotation plan")
+    parser.add_argument('--report', default=os.path.join(ROOT, 'reports', f'Executive_Summary_{date.today()}.pdf'))
+    parser.add_argument('--no-report', action='store_true')
+    parser.add_argument('--json', help="Write per-stage metrics to this file")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Imported here so --help stays instant
+    from database import Database
+    from ingest import import_csv, score_fatigue
+    from model import Model
+    from optimizer import Optimizer
+    from report_generator import ReportGenerator
+
+    pipeline = Pipeline()
+    code = EXIT_OK
+    try:
+        db = pipeline.run('init', Database, args.db)
+        if args.csv:
+            totals = pipeline.run('ingest', import_csv, args.csv, db, chunksize=args.chunk_size)
+            print(f"         imported {totals['rows']:,} rows ({totals['inserted']:,} new, "
+                  f"{totals['updated']:,} updated, {totals['unchanged']:,} unchanged)")
+        if args.analyze:
+            pipeline.run('analyze', db.analyze)
+
+        df = pipeline.run('load', db.get_employees)
+        if df.empty:
+            print("No employees to process", file=sys.stderr)
+            code = EXIT_EMPTY
+        else:
+            df = pipeline.run('fatigue', score_fatigue, df)
+
+            ai = Model(args.model_dir)
+            pipeline.run('artifacts', ai.ensure_loaded)
+            batch = dict(chunk_size=args.chunk_size, workers=args.workers, executor=args.executor)
+            if args.incremental:
+                state = pipeline.run('state', db.get_prediction_state)
+                scored = pipeline.run('score', score_incremental, ai, db, df, state, **batch)
+            else:
+                scored = pipeline.run('score', score_full, ai, db, df, **batch)
+            print(f"         scored {scored:,} employees")
+
+            predictions = pipeline.run('predictions', db.get_predictions)
+            if args.engine == 'solver':
+                from roster_solver import RosterSolver
+                optimized = pipeline.run('optimize', RosterSolver().solve, df, predictions)
+            else:
+                optimized = pipeline.run('optimize', Optimizer.run_optimization, df, predictions)
+            print(f"         {(optimized['Action'] != 'Maintained').sum():,} roster changes")
+            if args.roster:
+                os.makedirs(os.path.dirname(os.path.abspath(args.roster)), exist_ok=True)
+                pipeline.run('roster', optimized.to_csv, args.roster, index=False)
+            if args.rotation:
+                report = pipeline.run('rotation', plan_rotation, df, predictions, args.weeks, args.rotation)
+                print(f"         {args.weeks}-week rotation written to {args.rotation} "
+                      f"({report['solve_seconds'].sum():.2f}s solving)")
+
+            if not args.no_report:
+                path = pipeline.run('report', ReportGenerator().generate_pdf, df, predictions, optimized,
+                                    output_path=args.report)
+                print(f"         report written to {path}")
+    except StageFailed as e:
+        print(f"Pipeline failed at stage '{e}'", file=sys.stderr)
+        code = EXIT_FAILED
+
+    total = sum(s['seconds'] for s in pipeline.stages)
+    print(f"Total {total:.3f}s, exit code {code}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'exit_code': code, 'total_seconds': round(total, 3), 'stages': pipeline.stages}, f, indent=2)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
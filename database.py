@@ -1,113 +1,470 @@
 import sqlite3
+import threading
 import pandas as pd
 import os
+import re
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
+from snapshot_store import SnapshotStore
+from migrations import migrate, PREDICTIONS_DDL
+
+class ConnectionPool:
+    """
+    Shared SQLite connection manager (one pool per database file).
+    A thread checks out one connection and re-uses it for nested calls; idle
+    connections are kept for the next caller instead of being reopened.
+    Every connection runs in WAL mode so Streamlit sessions can read while
+    another session writes.
+    """
+    PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,       # 64 MB page cache
+        'mmap_size': 268435456,     # 256 MB memory-mapped reads
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    }
+    _pools = {}
+    _registry_lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, db_path, max_idle=8):
+        key = os.path.abspath(db_path)
+        with cls._registry_lock:
+            if key not in cls._pools:
+                cls._pools[key] = cls(db_path, max_idle)
+            return cls._pools[key]
+
+    def __init__(self, db_path, max_idle=8):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_path, timeout=self.PRAGMAS['busy_timeout'] / 1000,
+                               check_same_thread=False)
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            # Nested use on the same thread shares the checked-out connection
+            yield held
+            return
+
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            if conn.in_transaction:
+                conn.rollback()
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    conn = None
+            if conn is not None:
+                conn.close()
+
+    @contextmanager
+    def transaction(self):
+        with self.connection() as conn:
+            with conn:
+                yield conn
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
 
 class Database:
-    def __init__(self, db_path="data/shiftsync_v2.db"):
+    EMPLOYEE_COLUMNS = ['Employee_ID', 'Age', 'Gender', 'Department', 'Shift_Type', 
+                        'Daily_Wages', 'Overtime_Hours', 'Distance_km', 'Years_of_Service',
+                        'Last_Month_Leave', 'Satisfaction', 'Fatigue_Score', 'OT_Trend', 
+                        'Leave_Trend', 'last_updated']
+    PREDICTION_COLUMNS = ['Employee_ID', 'Attrition_Risk', 'Probability', 'Classification',
+                          'Feature_Hash', 'Scored_At']
+    EMPLOYEE_TEXT_COLUMNS = {'Employee_ID', 'Gender', 'Department', 'Shift_Type', 'OT_Trend',
+                             'Leave_Trend', 'last_updated'}
+    EMPLOYEE_REAL_COLUMNS = {'Fatigue_Score'}
+    VERSIONED_TABLES = ('employees', 'predictions')
+
+    def __init__(self, db_path="data/shiftsync_v2.db", snapshot_dir=None):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.pool = ConnectionPool.for_path(db_path)
         self.init_db()
 
+        # Optional columnar read replica of the employees table
+        self.snapshots = None
+        if snapshot_dir:
+            if SnapshotStore.available():
+                self.snapshots = SnapshotStore(snapshot_dir, {
+                    c: 'text' if c in self.EMPLOYEE_TEXT_COLUMNS else 'real' if c in self.EMPLOYEE_REAL_COLUMNS
+                    else 'integer' for c in self.EMPLOYEE_COLUMNS})
+            else:
+                print("pyarrow not installed; employee snapshots disabled")
+
     def init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # 1. Users Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE,
-                password TEXT,
-                role TEXT
-            )
-        ''')
-        
-        # 2. Employees Table (Dataset)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS employees (
-                Employee_ID TEXT PRIMARY KEY,
-                Age INTEGER,
-                Gender TEXT,
-                Department TEXT,
-                Shift_Type TEXT,
-                Daily_Wages INTEGER,
-                Overtime_Hours INTEGER,
-                Distance_km INTEGER,
-                Years_of_Service INTEGER,
-                Last_Month_Leave INTEGER,
-                Satisfaction INTEGER,
-                Fatigue_Score REAL,
-                OT_Trend TEXT,
-                Leave_Trend TEXT,
-                last_updated TIMESTAMP
-            )
-        ''')
-        
-        # 3. Predictions Table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS predictions (
-                Employee_ID TEXT PRIMARY KEY,
-                Attrition_Risk TEXT,
-                Probability REAL,
-                Classification TEXT,
-                FOREIGN KEY(Employee_ID) REFERENCES employees(Employee_ID)
-            )
-        ''')
-
-        # Insert default manager
-        cursor.execute("SELECT * FROM users WHERE username = 'admin'")
-        if not cursor.fetchone():
-            cursor.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", 
-                           ('admin', 'admin123', 'Senior HR Manager'))
-        
-        conn.commit()
-        conn.close()
+        with self.pool.connection() as conn:
+            # Schema lives in migrations.py; this is one SELECT once up to date
+            migrate(conn)
+
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
+            # Insert default manager
+            cursor.execute("SELECT * FROM users WHERE username = 'admin'")
+            if not cursor.fetchone():
+                cursor.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)", 
+                               ('admin', 'admin123', 'Senior HR Manager'))
+
+    def analyze(self):
+        """
+        Refreshes the query planner's statistics (ANALYZE). A maintenance step,
+        not part of startup: run it after large imports (cli.py --analyze).
+        """
+        with self.pool.connection() as conn:
+            conn.execute("ANALYZE")
+
+    def get_versions(self):
+        """Write counters per table; any change means cached reads are stale."""
+        with self.pool.connection() as conn:
+            return dict(conn.execute("SELECT name, version FROM table_versions").fetchall())
+
+    def _bump_versions(self, conn, *tables):
+        conn.executemany("UPDATE table_versions SET version = version + 1 WHERE name = ?",
+                         [(t,) for t in tables])
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Pooled connection; use as `with db.get_connection() as conn:`."""
+        return self.pool.connection()
 
-    def save_employees(self, df):
-        conn = sqlite3.connect(self.db_path)
+    def save_employees(self, df, mode="append", batch_size=5000):
+        """
+        mode='append' keeps the original to_sql merge behaviour.
+        mode='upsert' inserts new Employee_IDs and updates existing ones in place
+        (INSERT ... ON CONFLICT DO UPDATE), skipping rows whose values are unchanged.
+        Returns a dict with 'inserted', 'updated' and 'unchanged' counts.
+        """
         df['last_updated'] = datetime.now()
         
-        # Define schema columns to prevent schema mismatch errors
-        schema_cols = ['Employee_ID', 'Age', 'Gender', 'Department', 'Shift_Type', 
-                       'Daily_Wages', 'Overtime_Hours', 'Distance_km', 'Years_of_Service',
-                       'Last_Month_Leave', 'Satisfaction', 'Fatigue_Score', 'OT_Trend', 
-                       'Leave_Trend', 'last_updated']
-        
         # Only keep columns that exist in both the dataframe and schema
-        cols_to_save = [c for c in schema_cols if c in df.columns]
+        cols_to_save = [c for c in self.EMPLOYEE_COLUMNS if c in df.columns]
         df_filtered = df[cols_to_save]
-        
-        # Use append to allow merging of multiple uploads
-        df_filtered.to_sql('employees', conn, if_exists='append', index=False, method='multi')
-        conn.close()
+
+        if mode == "upsert":
+            return self._upsert_employees(df_filtered, batch_size)
+
+        with self.pool.connection() as conn:
+            # Use append to allow merging of multiple uploads; batched executemany
+            # stays under SQLite's bound-variable limit at any size
+            df_filtered.to_sql('employees', conn, if_exists='append', index=False, chunksize=batch_size)
+            with conn:
+                self._bump_versions(conn, 'employees')
+        return {'inserted': len(df_filtered), 'updated': 0, 'unchanged': 0}
+
+    def _upsert_employees(self, df, batch_size):
+        # The last occurrence of a repeated ID in one upload wins
+        df = df.drop_duplicates('Employee_ID', keep='last')
+        cols = list(df.columns)
+        data_cols = [c for c in cols if c not in ('Employee_ID', 'last_updated')]
+
+        # Only touch rows whose data actually changed so last_updated stays meaningful
+        sql = (
+            f"INSERT INTO employees ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+            f"ON CONFLICT(Employee_ID) DO UPDATE SET "
+            + ", ".join(f"{c} = excluded.{c}" for c in cols if c != 'Employee_ID')
+            + (" WHERE " + " OR ".join(f"employees.{c} IS NOT excluded.{c}" for c in data_cols)
+               if data_cols else "")
+        )
+
+        rows = self._sql_rows(df)
+        if 'last_updated' in rows.columns:
+            rows['last_updated'] = rows['last_updated'].astype(str)
+
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            before = cursor.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+            changes = conn.total_changes
+            with conn:
+                for start in range(0, len(rows), batch_size):
+                    batch = rows.iloc[start:start + batch_size]
+                    cursor.executemany(sql, batch.itertuples(index=False, name=None))
+                written = conn.total_changes - changes
+                if written:
+                    self._bump_versions(conn, 'employees')
+            after = cursor.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+        inserted = after - before
+        return {'inserted': inserted, 'updated': written - inserted, 'unchanged': len(rows) - written}
+
+    @staticmethod
+    def _sql_rows(df):
+        # Plain Python values for the sqlite3 driver (no numpy scalars, NaN -> NULL)
+        rows = df.astype(object).where(df.notna(), None)
+        rows['Employee_ID'] = rows['Employee_ID'].astype(str)
+        return rows
 
     def clear_employees(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM employees")
-        cursor.execute("DELETE FROM predictions")
-        conn.commit()
-        conn.close()
-
-    def get_employees(self):
-        conn = self.get_connection()
-        df = pd.read_sql("SELECT * FROM employees", conn)
-        conn.close()
-        return df
-
-    def save_predictions(self, pred_df):
-        conn = self.get_connection()
-        pred_df.to_sql('predictions', conn, if_exists='replace', index=False)
-        conn.close()
+        with self.pool.transaction() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM employees")
+            cursor.execute("DELETE FROM predictions")
+            self._bump_versions(conn, 'employees', 'predictions')
+
+    def get_employees(self, columns=None, filters=None, snapshot_date=None):
+        """
+        columns: optional projection; filters: {column: value or list of values}.
+        Served from the Parquet snapshot when it is current (or a past
+        snapshot_date is requested), otherwise from SQLite.
+        """
+        self._check_columns(list(columns or []) + list(filters or {}))
+        if self.snapshots and (snapshot_date or
+                               self.snapshots.version() == self.get_versions()['employees']):
+            return self.snapshots.read(columns, filters, snapshot_date)
+
+        where, params = self._where(filters)
+        with self.pool.connection() as conn:
+            return pd.read_sql(f"SELECT {', '.join(columns) if columns else '*'} FROM employees{where}",
+                               conn, params=params)
+
+    def overview_summary(self, fatigue_bin=5, ot_bin=2):
+        """
+        Dashboard aggregates computed with GROUP BY in SQLite, so the page only
+        ships a few hundred summary rows to the browser however large the
+        workforce is:
+          metrics      - headcount, average fatigue, critical (> 75) count
+          dept_shift   - headcount per Department x Shift_Type
+          fatigue_hist - headcount per fatigue_bin-wide Fatigue_Score bin
+          ot_fatigue   - headcount and high-risk share per (OT, fatigue) cell
+        """
+        with self.pool.connection() as conn:
+            metrics = conn.execute(
+                "SELECT COUNT(*), AVG(Fatigue_Score), COALESCE(SUM(Fatigue_Score > 75), 0) FROM employees"
+            ).fetchone()
+            dept_shift = pd.read_sql(
+                "SELECT Department, Shift_Type, COUNT(*) AS Employees FROM employees "
+                "GROUP BY Department, Shift_Type ORDER BY Department, Shift_Type", conn)
+            fatigue_hist = pd.read_sql(
+                "SELECT CAST(Fatigue_Score / ? AS INTEGER) * ? AS Fatigue_Bin, COUNT(*) AS Employees "
+                "FROM employees WHERE Fatigue_Score IS NOT NULL GROUP BY Fatigue_Bin ORDER BY Fatigue_Bin",
+                conn, params=(fatigue_bin, fatigue_bin))
+            # Share is NULL for cells where nobody has been scored yet
+            ot_fatigue = pd.read_sql(
+                "SELECT CAST(e.Overtime_Hours / ? AS INTEGER) * ? AS OT_Bin, "
+                "CAST(e.Fatigue_Score / ? AS INTEGER) * ? AS Fatigue_Bin, COUNT(*) AS Employees, "
+                "AVG(CASE WHEN p.Employee_ID IS NULL THEN NULL "
+                "WHEN p.Attrition_Risk = 'High' THEN 1.0 ELSE 0.0 END) AS High_Risk_Share "
+                "FROM employees e LEFT JOIN predictions p ON p.Employee_ID = e.Employee_ID "
+                "WHERE e.Overtime_Hours IS NOT NULL AND e.Fatigue_Score IS NOT NULL "
+                "GROUP BY OT_Bin, Fatigue_Bin",
+                conn, params=(ot_bin, ot_bin, fatigue_bin, fatigue_bin))
+
+        return {
+            'metrics': {'headcount': metrics[0], 'avg_fatigue': metrics[1] or 0.0, 'critical': metrics[2]},
+            'dept_shift': dept_shift,
+            'fatigue_hist': fatigue_hist,
+            'ot_fatigue': ot_fatigue,
+        }
+
+    def snapshot_employees(self, snapshot_date=None, chunksize=100000):
+        """Streams the employees table into a dated Parquet snapshot; returns rows written."""
+        if not self.snapshots:
+            return 0
+        with self.pool.connection() as conn:
+            version = self.get_versions()['employees']
+            chunks = pd.read_sql("SELECT * FROM employees", conn, chunksize=chunksize)
+            return self.snapshots.write(chunks, snapshot_date, version)
+
+    def _check_columns(self, columns):
+        unknown = set(columns) - set(self.EMPLOYEE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown employee columns: {sorted(unknown)}")
+
+    @staticmethod
+    def _where(filters, qualify=None, extra=None):
+        """WHERE clause and params; qualify maps filter keys to SQL column expressions."""
+        clauses, params = [], []
+        for col, value in (filters or {}).items():
+            col = (qualify or {}).get(col, col)
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                clauses.append(f"{col} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{col} = ?")
+                params.append(value)
+        if extra:
+            clauses.append(extra[0])
+            params.extend(extra[1])
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def save_predictions(self, pred_df, mode="replace", staging=None):
+        """
+        Writes into the declared predictions schema (never drops the table).
+        mode='replace' swaps the contents, 'append' adds a chunk (see
+        Model.predict_attrition_batched), 'upsert' inserts or updates by
+        Employee_ID (incremental re-scoring) and 'stage' appends a chunk to the
+        `staging` table returned by stage_predictions().
+        """
+        cols = [c for c in self.PREDICTION_COLUMNS if c in pred_df.columns]
+        table = self._staging_table(staging) if mode == "stage" else 'predictions'
+        sql = f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))})"
+        if mode == "upsert":
+            sql += (" ON CONFLICT(Employee_ID) DO UPDATE SET "
+                    + ", ".join(f"{c} = excluded.{c}" for c in cols if c != 'Employee_ID'))
+        rows = self._sql_rows(pred_df[cols])
+
+        with self.pool.transaction() as conn:
+            if mode == "replace":
+                conn.execute("DELETE FROM predictions")
+            conn.executemany(sql, rows.itertuples(index=False, name=None))
+            if mode != "stage":
+                self._bump_versions(conn, 'predictions')
+
+    # Registry filters -> columns of the predictions (p) / employees (e) join
+    REGISTRY_FILTERS = {'Attrition_Risk': 'p.Attrition_Risk', 'Department': 'e.Department',
+                        'Shift_Type': 'e.Shift_Type'}
+
+    def _registry_where(self, filters, extra=None):
+        unknown = set(filters or {}) - set(self.REGISTRY_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown registry filters: {sorted(unknown)}")
+        # Empty selections mean "no filter", not "match nothing"
+        filters = {k: v for k, v in (filters or {}).items() if v not in (None, [], ())}
+        return self._where(filters, self.REGISTRY_FILTERS, extra)
+
+    def page_predictions(self, filters=None, after=None, limit=50):
+        """
+        Risk registry page, highest Probability first (Employee_ID breaks ties).
+        Keyset pagination: pass the returned cursor as `after` for the next
+        page, so deep pages cost the same as the first one (no OFFSET scan).
+        filters: {Attrition_Risk|Department|Shift_Type: value or list}.
+        Returns (page DataFrame, cursor or None when there are no more rows).
+        """
+        extra = ("(p.Probability, p.Employee_ID) < (?, ?)", list(after)) if after else None
+        where, params = self._registry_where(filters, extra)
+        sql = ("SELECT p.Employee_ID, p.Attrition_Risk, p.Probability, p.Classification, "
+               "e.Department, e.Shift_Type, e.Fatigue_Score "
+               "FROM predictions p LEFT JOIN employees e ON e.Employee_ID = p.Employee_ID"
+               f"{where} ORDER BY p.Probability DESC, p.Employee_ID DESC LIMIT ?")
+        with self.pool.connection() as conn:
+            page = pd.read_sql(sql, conn, params=params + [limit + 1])
+        return self._keyset(page, limit, ['Probability', 'Employee_ID'])
+
+    def risk_counts(self):
+        with self.pool.connection() as conn:
+            return pd.read_sql("SELECT Attrition_Risk, COUNT(*) AS Employees FROM predictions "
+                               "GROUP BY Attrition_Risk", conn)
+
+    def count_predictions(self, filters=None):
+        where, params = self._registry_where(filters)
+        # The employees join is only needed when filtering on its columns
+        join = (" LEFT JOIN employees e ON e.Employee_ID = p.Employee_ID"
+                if {'Department', 'Shift_Type'} & set(filters or {}) else "")
+        with self.pool.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM predictions p{join}{where}", params).fetchone()[0]
+
+    def page_employees(self, filters=None, after=None, limit=50, columns=None):
+        """Employees in Employee_ID order, keyset-paginated like page_predictions."""
+        self._check_columns(list(columns or []) + list(filters or {}))
+        if columns and 'Employee_ID' not in columns:
+            columns = ['Employee_ID'] + list(columns)
+        extra = ("Employee_ID > ?", [after[0]]) if after else None
+        where, params = self._where(filters, extra=extra)
+        sql = (f"SELECT {', '.join(columns) if columns else '*'} FROM employees{where} "
+               "ORDER BY Employee_ID LIMIT ?")
+        with self.pool.connection() as conn:
+            page = pd.read_sql(sql, conn, params=params + [limit + 1])
+        return self._keyset(page, limit, ['Employee_ID'])
+
+    def count_employees(self, filters=None):
+        self._check_columns(list(filters or {}))
+        where, params = self._where(filters)
+        with self.pool.connection() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM employees{where}", params).fetchone()[0]
+
+    @staticmethod
+    def _keyset(page, limit, keys):
+        # One extra row was fetched to know whether another page exists
+        if len(page) <= limit:
+            return page, None
+        page = page.iloc[:limit]
+        last = page.iloc[-1]
+        return page, tuple(last[k].item() if hasattr(last[k], 'item') else last[k] for k in keys)
+
+    def get_prediction_state(self):
+        """Per-employee feature hash and scoring time, for incremental re-scoring."""
+        with self.pool.connection() as conn:
+            # NULL hashes (rows scored before hashing existed) never match a real one
+            return pd.read_sql("SELECT Employee_ID, COALESCE(Feature_Hash, 0) AS Feature_Hash, Scored_At "
+                               "FROM predictions", conn)
+
+    @staticmethod
+    def staging_table(run_id):
+        """Name of the staging table for one full re-score run."""
+        return Database._staging_table(f"predictions_staging_{run_id}")
+
+    @staticmethod
+    def _staging_table(name):
+        # The name is interpolated into SQL, so only accept our own pattern
+        if not isinstance(name, str) or not re.fullmatch(r"predictions_staging_\w+", name):
+            raise ValueError(f"Not a predictions staging table: {name!r}")
+        return name
+
+    def stage_predictions(self, run_id=None):
+        """
+        Starts a full re-score and returns its staging table: chunks saved with
+        mode='stage' collect there and only publish_predictions() replaces the
+        live table, so a run that fails part-way leaves the old predictions in
+        place. Every run stages into its own table (run_id, e.g. a job id, or a
+        random one), so concurrent full re-scores never mix their rows; the
+        last one to publish wins.
+        """
+        staging = self.staging_table(run_id or uuid.uuid4().hex)
+        with self.pool.transaction() as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {staging}")
+            conn.execute(PREDICTIONS_DDL.format(name=staging))
+        return staging
+
+    def publish_predictions(self, staging):
+        """Replaces the predictions with the staged ones in one transaction."""
+        staging = self._staging_table(staging)
+        cols = ', '.join(self.PREDICTION_COLUMNS)
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM predictions")
+            conn.execute(f"INSERT INTO predictions ({cols}) SELECT {cols} FROM {staging}")
+            conn.execute(f"DROP TABLE {staging}")
+            self._bump_versions(conn, 'predictions')
+
+    def discard_staged_predictions(self, staging):
+        staging = self._staging_table(staging)
+        with self.pool.transaction() as conn:
+            conn.execute(f"DROP TABLE IF EXISTS {staging}")
+
+    def clear_predictions(self):
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM predictions")
+            self._bump_versions(conn, 'predictions')
+
+    def get_predictions(self):
+        with self.pool.connection() as conn:
+            return pd.read_sql("SELECT * FROM predictions", conn)
 
     def verify_user(self, username, password):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT role FROM users WHERE username = ? AND password = ?", (username, password))
-        result = cursor.fetchone()
-        conn.close()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT role FROM users WHERE username = ? AND password = ?", (username, password))
+            result = cursor.fetchone()
         return result[0] if result else None
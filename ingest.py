@@ -0,0 +1,92 @@
+import os
+import pandas as pd
+from optimizer import Optimizer
+
+# Canonical column names keyed by their normalized CSV header
+COLUMN_MAP = {
+    'employee_id': 'Employee_ID', 'age': 'Age', 'gender': 'Gender',
+    'department': 'Department', 'shift_type': 'Shift_Type',
+    'daily_wages': 'Daily_Wages', 'overtime_hours': 'Overtime_Hours',
+    'distance_km': 'Distance_km', 'years_of_service': 'Years_of_Service',
+    'last_month_leave': 'Last_Month_Leave', 'satisfaction': 'Satisfaction',
+    'fatigue_score': 'Fatigue_Score', 'attrition': 'Attrition',
+    'ot_trend': 'OT_Trend', 'leave_trend': 'Leave_Trend'
+}
+
+DEFAULTS = {
+    'Employee_ID': 'Unknown', 'Age': 30, 'Gender': 'Male', 'Department': 'Production',
+    'Shift_Type': 'Morning', 'Daily_Wages': 500, 'Overtime_Hours': 0, 'Distance_km': 5,
+    'Years_of_Service': 1, 'Last_Month_Leave': 0, 'Satisfaction': 3,
+    'OT_Trend': 'Stable', 'Leave_Trend': 'Stable'
+}
+
+# Explicit parse types so chunks never fall back to per-chunk type inference
+DTYPES = {
+    'Employee_ID': str, 'Age': 'float64', 'Gender': str, 'Department': str,
+    'Shift_Type': str, 'Daily_Wages': 'float64', 'Overtime_Hours': 'float64',
+    'Distance_km': 'float64', 'Years_of_Service': 'float64',
+    'Last_Month_Leave': 'float64', 'Satisfaction': 'float64',
+    'Fatigue_Score': 'float64', 'Attrition': str, 'OT_Trend': str, 'Leave_Trend': str
+}
+
+def normalize_header(col):
+    return str(col).strip().lower().replace(' ', '_')
+
+def standardize_columns(df):
+    if df.empty: return df
+    df.columns = [normalize_header(c) for c in df.columns]
+    df = df.rename(columns={c: COLUMN_MAP[c] for c in df.columns if c in COLUMN_MAP})
+    for col, val in DEFAULTS.items():
+        if col not in df.columns: df[col] = val
+        else: df[col] = df[col].fillna(val)
+    return df
+
+def fill_fatigue(df):
+    # Expects standardized columns (see standardize_columns)
+    if df.empty: return df
+    if 'Fatigue_Score' in df.columns: return df
+    df['Fatigue_Score'] = Optimizer.calculate_fatigue_batch(df)
+    return df
+
+def score_fatigue(df):
+    return fill_fatigue(standardize_columns(df))
+
+def iter_csv_chunks(source, chunksize=50000):
+    """
+    Streams a CSV in fixed-size chunks with explicit dtypes.
+    Only recognised employee columns are parsed; headers are matched after
+    normalization, so 'Overtime Hours' and 'overtime_hours' both work.
+    """
+    if hasattr(source, 'seek'): source.seek(0)
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, 'seek'): source.seek(0)
+
+    keep = [c for c in header if normalize_header(c) in COLUMN_MAP]
+    dtypes = {c: DTYPES[COLUMN_MAP[normalize_header(c)]] for c in keep}
+    return pd.read_csv(source, usecols=keep, dtype=dtypes, chunksize=chunksize)
+
+def import_csv(source, db, chunksize=50000, on_progress=None):
+    """
+    Streaming Import Pipeline.
+    Each chunk is standardized, fatigue-scored and upserted in its own
+    transaction, so memory use is bounded by the chunk size, not the file.
+    on_progress(fraction, totals) is called after every committed chunk.
+    """
+    handle = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        handle.seek(0, os.SEEK_END)
+        size = handle.tell() or 1
+        handle.seek(0)
+
+        totals = {'rows': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for chunk in iter_csv_chunks(handle, chunksize):
+            chunk = score_fatigue(chunk)
+            stats = db.save_employees(chunk, mode="upsert")
+            totals['rows'] += len(chunk)
+            for key in ('inserted', 'updated', 'unchanged'):
+                totals[key] += stats[key]
+            if on_progress:
+                on_progress(min(handle.tell() / size, 1.0), totals)
+        return totals
+    finally:
+        if handle is not source: handle.close()
@@ -0,0 +1,40 @@
+"""
+ShiftSync Background Job Worker.
+Dedicated entry point for JobQueue workers. JobQueue starts it as a plain
+subprocess, never through multiprocessing, so the Streamlit script is not
+re-imported:
+
+    python job_worker.py --db data/shiftsync_v2.db
+
+Claims queued jobs from the jobs table one at a time (each row carries its
+artifact and model directories) and exits after --idle seconds without work.
+"""
+import argparse
+import os
+import sys
+import time
+
+from database import Database
+from jobs import claim_job, run_job
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run queued ShiftSync background jobs")
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--idle', type=float, default=60, help="Exit after this many seconds without work")
+    parser.add_argument('--poll', type=float, default=0.5, help="Seconds between queue checks when idle")
+    args = parser.parse_args(argv)
+
+    db = Database(args.db)
+    idle_since = time.monotonic()
+    while True:
+        job = claim_job(db, os.getpid())
+        if job is None:
+            if time.monotonic() - idle_since >= args.idle:
+                return 0
+            time.sleep(args.poll)
+            continue
+        run_job(db, *job)
+        idle_since = time.monotonic()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from ingest import score_fatigue
+
+ACTIVE = ('queued', 'running')
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'job_worker.py')
+
+class JobQueue:
+    """
+    Local Background Job Queue.
+    Long-running actions (risk assessment, roster optimization, PDF export)
+    run in worker processes instead of the Streamlit script thread. Every job
+    is a row in the `jobs` table, and the table is the queue: workers are
+    started from job_worker.py, a dedicated entry point that never imports the
+    Streamlit script, and claim queued rows one at a time. Progress, results
+    and artifacts are visible to any session and survive reruns. Submissions
+    are keyed by a hash of the job kind, its parameters and the versions of
+    the tables it reads: an identical request returns the existing queued,
+    running or finished job instead of recomputing. A worker that dies
+    mid-job (OOM, SIGKILL) is noticed from its pid and its job is failed, so
+    it is never served as a cache hit.
+    """
+    _procs = {}  # pid -> (db path, Popen) for workers started by this process
+    _lock = threading.Lock()
+
+    # Tables each job kind reads; their versions are part of the cache key
+    INPUTS = {
+        'risk_assessment': ('employees',),
+        'optimize': ('employees', 'predictions'),
+        'report': ('employees', 'predictions'),
+    }
+
+    def __init__(self, db, artifact_dir="data/artifacts", workers=2, model_dir="src",
+                 idle_timeout=60, stale_after=6 * 3600):
+        self.db = db
+        self.db_path = os.path.abspath(db.db_path)
+        self.artifact_dir = os.path.abspath(artifact_dir)
+        self.workers = workers
+        self.model_dir = os.path.abspath(model_dir)
+        # Idle workers exit after idle_timeout seconds; stale_after bounds running
+        # jobs whose worker can't be probed (another process's pid on Windows)
+        self.idle_timeout = idle_timeout
+        self.stale_after = stale_after
+        os.makedirs(self.artifact_dir, exist_ok=True)
+
+        # Fail jobs whose worker is gone; queued ones are picked up again
+        self.reap()
+        self._ensure_workers()
+
+    @classmethod
+    def _alive(cls, pid):
+        """True/False for a worker pid, or None when it can't be probed."""
+        if pid is None:
+            return False
+        entry = cls._procs.get(pid)
+        if entry is not None:
+            return entry[1].poll() is None
+        if os.name == 'nt':
+            # os.kill(pid, 0) would terminate the process on Windows
+            return None
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def reap(self):
+        """Fails running jobs whose worker process has exited; returns how many."""
+        with self.db.pool.connection() as conn:
+            running = conn.execute("SELECT id, worker_pid, started_at FROM jobs WHERE status = 'running'").fetchall()
+        cutoff = (datetime.now() - timedelta(seconds=self.stale_after)).isoformat(sep=' ', timespec='seconds')
+        dead = []
+        for job_id, pid, started_at in running:
+            alive = self._alive(pid)
+            if alive is False or (alive is None and (started_at or '') < cutoff):
+                dead.append(job_id)
+        if dead:
+            with self.db.pool.transaction() as conn:
+                conn.executemany("UPDATE jobs SET status = 'failed', error = 'worker process exited', "
+                                 "finished_at = ? WHERE id = ? AND status = 'running'",
+                                 [(_now(), job_id) for job_id in dead])
+            # A killed full re-score can't clean up its own staging table
+            for job_id in dead:
+                self.db.discard_staged_predictions(self.db.staging_table(f"job{job_id}"))
+        return len(dead)
+
+    def _ensure_workers(self):
+        """Starts workers (up to `workers` for this database) while jobs are waiting."""
+        with self.db.pool.connection() as conn:
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+        with JobQueue._lock:
+            for pid, (path, proc) in list(JobQueue._procs.items()):
+                if proc.poll() is not None:
+                    del JobQueue._procs[pid]
+            # Each live worker will take one waiting job
+            live = sum(path == self.db_path for path, _ in JobQueue._procs.values())
+            for _ in range(min(self.workers, queued) - live):
+                proc = subprocess.Popen([sys.executable, WORKER_SCRIPT, '--db', self.db_path,
+                                         '--idle', str(self.idle_timeout)])
+                JobQueue._procs[proc.pid] = (self.db_path, proc)
+
+    def input_hash(self, kind, params):
+        versions = self.db.get_versions()
+        payload = {
+            'kind': kind,
+            'params': params,
+            'versions': {t: versions.get(t) for t in self.INPUTS[kind]},
+        }
+        if kind == 'risk_assessment':
+            model_file = os.path.join(self.model_dir, 'adv_model.pkl')
+            stat = os.stat(model_file) if os.path.exists(model_file) else None
+            payload['model'] = (stat.st_size, stat.st_mtime_ns) if stat else None
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def submit(self, kind, params=None):
+        """Queues a job (or returns the cached/in-flight one with the same inputs); returns its id."""
+        if kind not in TASKS:
+            raise ValueError(f"Unknown job kind: {kind}")
+        params = params or {}
+        digest = self.input_hash(kind, params)
+
+        # A dead worker's job must not be returned as the in-flight match
+        self.reap()
+        with self.db.pool.transaction() as conn:
+            row = conn.execute("SELECT id FROM jobs WHERE input_hash = ? AND status IN ('queued', 'running', 'done') "
+                               "ORDER BY id DESC LIMIT 1", (digest,)).fetchone()
+            if row:
+                return row[0]
+            job_id = conn.execute(
+                "INSERT INTO jobs (kind, params, input_hash, status, submitted_at, artifact_dir, model_dir) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (kind, json.dumps(params), digest, _now(), self.artifact_dir, self.model_dir)).lastrowid
+
+        try:
+            self._ensure_workers()
+        except Exception as e:
+            with self.db.pool.transaction() as conn:
+                conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                             "WHERE id = ? AND status = 'queued'",
+                             (f"could not start worker: {type(e).__name__}: {e}", _now(), job_id))
+            raise
+        return job_id
+
+    def get(self, job_id):
+        job = self._read(job_id)
+        if job is not None and job['status'] in ACTIVE:
+            # Status polls notice dead workers and restart idle-exited ones
+            if self.reap():
+                job = self._read(job_id)
+            self._ensure_workers()
+        return job
+
+    def _read(self, job_id):
+        with self.db.pool.connection() as conn:
+            cursor = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            job = dict(zip([c[0] for c in cursor.description], row))
+        job['params'] = json.loads(job['params'] or '{}')
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def recent(self, limit=20):
+        with self.db.pool.connection() as conn:
+            return pd.read_sql("SELECT id, kind, status, progress, message, artifact, submitted_at, finished_at "
+                               "FROM jobs ORDER BY id DESC LIMIT ?", conn, params=(limit,))
+
+    def artifact_bytes(self, job_id):
+        job = self._read(job_id)
+        if not job or job['status'] != 'done' or not job['artifact']:
+            return None
+        path = os.path.join(job['artifact_dir'] or self.artifact_dir, job['artifact'])
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+def _now():
+    return datetime.now().isoformat(sep=' ', timespec='seconds')
+
+class JobContext:
+    """Handed to a task inside the worker process: database access and progress reporting."""
+
+    def __init__(self, db, job_id, artifact_dir, model_dir):
+        self.db = db
+        self.job_id = job_id
+        self.artifact_dir = artifact_dir
+        self.model_dir = model_dir
+
+    def progress(self, fraction, message=None):
+        with self.db.pool.transaction() as conn:
+            conn.execute("UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ?",
+                         (round(float(fraction), 4), message, self.job_id))
+
+    def artifact_path(self, ext):
+        return os.path.join(self.artifact_dir, f"job_{self.job_id}.{ext}")
+
+    def workforce(self):
+        return score_fatigue(self.db.get_employees())
+
+def claim_job(db, worker_pid):
+    """
+    Moves the oldest queued job to running for this worker; returns
+    (id, kind, params, artifact_dir, model_dir) or None.
+    """
+    while True:
+        with db.pool.transaction() as conn:
+            row = conn.execute("SELECT id, kind, params, artifact_dir, model_dir FROM jobs "
+                               "WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            claimed = conn.execute("UPDATE jobs SET status = 'running', started_at = ?, worker_pid = ? "
+                                   "WHERE id = ? AND status = 'queued'", (_now(), worker_pid, row[0])).rowcount
+        # Another worker may have claimed it between the SELECT and the UPDATE
+        if claimed:
+            job_id, kind, params, artifact_dir, model_dir = row
+            return (job_id, kind, json.loads(params or '{}'),
+                    artifact_dir or os.path.abspath("data/artifacts"), model_dir or os.path.abspath("src"))
+
+def run_job(db, job_id, kind, params, artifact_dir, model_dir):
+    """Runs one claimed job in the worker and records its outcome in the jobs table."""
+    ctx = JobContext(db, job_id, artifact_dir, model_dir)
+    try:
+        result, artifact = TASKS[kind](ctx, params)
+        # Results must already be plain JSON; anything else fails the job here
+        result = json.dumps(result)
+    except Exception as e:
+        traceback.print_exc()
+        with db.pool.transaction() as conn:
+            conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                         (f"{type(e).__name__}: {e}", _now(), job_id))
+        return
+    with db.pool.transaction() as conn:
+        conn.execute("UPDATE jobs SET status = 'done', progress = 1, message = 'Finished', result = ?, "
+                     "artifact = ?, finished_at = ? WHERE id = ?",
+                     (result, artifact and os.path.basename(artifact), _now(), job_id))
+
+# --- TASKS ---
+# Each task takes (ctx, params) and returns (JSON-able result, artifact path or None)
+
+def risk_assessment_task(ctx, params):
+    from model import Model
+    ai = Model(ctx.model_dir)
+    ctx.progress(0.05, "Loading workforce")
+    df = ctx.workforce()
+    total = max(len(df), 1)
+    done = [0]
+
+    def sink(chunk, mode, staging=None):
+        ctx.db.save_predictions(chunk, mode=mode, staging=staging)
+        done[0] += len(chunk)
+        ctx.progress(0.1 + 0.9 * done[0] / total, f"{done[0]:,} employees scored")
+
+    ctx.progress(0.1, "Scoring workforce")
+    if params.get('incremental', True):
+        scored = ai.predict_incremental(df, ctx.db.get_prediction_state(),
+                                        on_chunk=lambda chunk: sink(chunk, "upsert"))
+    else:
+        # Stage the full re-score so a failed run keeps the previous predictions
+        # (in this job's own staging table, so concurrent full runs never mix rows)
+        staging = ctx.db.stage_predictions(f"job{ctx.job_id}")
+        try:
+            scored = ai.predict_attrition_batched(df, with_hash=True,
+                                                  on_chunk=lambda chunk: sink(chunk, "stage", staging))
+            if scored is None:
+                raise RuntimeError("model returned no predictions")
+            ctx.db.publish_predictions(staging)
+        except Exception:
+            ctx.db.discard_staged_predictions(staging)
+            raise
+    return {'scored': int(scored or 0)}, None
+
+def _optimize(ctx, params):
+    from optimizer import Optimizer
+    from roster_solver import RosterSolver
+    ctx.progress(0.05, "Loading workforce and predictions")
+    df = ctx.workforce()
+    preds = ctx.db.get_predictions()
+    ctx.progress(0.3, "Optimizing roster")
+    if params.get('engine') == 'solver':
+        optimized = RosterSolver().solve(df, preds)
+    else:
+        optimized = Optimizer.run_optimization(df, preds)
+    return df, preds, optimized
+
+def optimize_task(ctx, params):
+    df, preds, optimized = _optimize(ctx, params)
+    ctx.progress(0.9, "Saving roster")
+    path = ctx.artifact_path('csv')
+    optimized.to_csv(path, index=False)
+    report = optimized.attrs.get('join_report', {})
+    result = {
+        'rows': len(optimized),
+        'changed': int((optimized['Action'] != 'Maintained').sum()),
+        'unmatched': len(report.get('unmatched', [])),
+        'stale': len(report.get('stale', [])),
+    }
+    if 'solver_report' in optimized.attrs:
+        result['solver_report'] = optimized.attrs['solver_report'].to_dict('records')
+    return result, path
+
+def report_task(ctx, params):
+    from report_generator import ReportGenerator
+    df, preds, optimized = _optimize(ctx, params)
+    ctx.progress(0.6, "Rendering PDF")
+    path = ReportGenerator().generate_pdf(df, preds, optimized, output_path=ctx.artifact_path('pdf'))
+    return {'changed': int((optimized['Action'] != 'Maintained').sum())}, path
+
+TASKS = {
+    'risk_assessment': risk_assessment_task,
+    'optimize': optimize_task,
+    'report': report_task,
+}
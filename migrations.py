@@ -0,0 +1,188 @@
+"""
+Versioned SQLite Schema Migrations.
+Each migration runs once, in order, inside one IMMEDIATE transaction, and is
+recorded in `schema_version`. Startup on an up-to-date database costs a
+single SELECT. Every step is also written to be safe on databases created
+before migrations existed (IF NOT EXISTS / introspection).
+"""
+from datetime import datetime
+
+PREDICTIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS {name} (
+        Employee_ID TEXT PRIMARY KEY,
+        Attrition_Risk TEXT,
+        Probability REAL,
+        Classification TEXT,
+        Feature_Hash INTEGER,
+        Scored_At TIMESTAMP,
+        FOREIGN KEY(Employee_ID) REFERENCES employees(Employee_ID)
+    )
+'''
+
+def _base_schema(cursor):
+    # 1. Users Table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            role TEXT
+        )
+    ''')
+
+    # 2. Employees Table (Dataset)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS employees (
+            Employee_ID TEXT PRIMARY KEY,
+            Age INTEGER,
+            Gender TEXT,
+            Department TEXT,
+            Shift_Type TEXT,
+            Daily_Wages INTEGER,
+            Overtime_Hours INTEGER,
+            Distance_km INTEGER,
+            Years_of_Service INTEGER,
+            Last_Month_Leave INTEGER,
+            Satisfaction INTEGER,
+            Fatigue_Score REAL,
+            OT_Trend TEXT,
+            Leave_Trend TEXT,
+            last_updated TIMESTAMP
+        )
+    ''')
+
+    # 3. Predictions Table
+    cursor.execute(PREDICTIONS_DDL.format(name='predictions'))
+
+    # 4. Table Versions (cache invalidation counters)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    cursor.executemany("INSERT OR IGNORE INTO table_versions (name, version) VALUES (?, 0)",
+                       [('employees',), ('predictions',)])
+
+def _declared_predictions(cursor):
+    """
+    Older builds wrote predictions with to_sql(if_exists='replace'), which
+    dropped the declared table and left one without the Employee_ID key or
+    the incremental-scoring columns. Rebuild such a table in place, keeping
+    the latest row per employee.
+    """
+    info = {r[1]: r[5] for r in cursor.execute("PRAGMA table_info(predictions)")}
+    declared = ['Employee_ID', 'Attrition_Risk', 'Probability', 'Classification', 'Feature_Hash', 'Scored_At']
+    if info.get('Employee_ID') == 1 and all(c in info for c in declared):
+        return
+
+    cursor.execute("DROP TABLE IF EXISTS predictions_rebuild")
+    cursor.execute(PREDICTIONS_DDL.format(name='predictions_rebuild'))
+    cols = ', '.join(c for c in declared if c in info)
+    cursor.execute(f"INSERT INTO predictions_rebuild ({cols}) SELECT {cols} FROM predictions "
+                   "WHERE rowid IN (SELECT MAX(rowid) FROM predictions GROUP BY Employee_ID)")
+    cursor.execute("DROP TABLE predictions")
+    cursor.execute("ALTER TABLE predictions_rebuild RENAME TO predictions")
+
+def _registry_indexes(cursor):
+    # Risk registry sort/filter orders, so a page reads only its own rows
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_predictions_probability "
+                   "ON predictions(Probability, Employee_ID)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_predictions_risk "
+                   "ON predictions(Attrition_Risk, Probability, Employee_ID)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_department "
+                   "ON employees(Department, Shift_Type)")
+
+def _covering_indexes(cursor):
+    # The unique index from the pre-migration schema is redundant with the primary key
+    cursor.execute("DROP INDEX IF EXISTS idx_predictions_employee")
+    # Shift and fatigue-threshold filters, fatigue histogram
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_shift ON employees(Shift_Type, Department)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_fatigue ON employees(Fatigue_Score)")
+
+def _jobs(cursor):
+    # Background job queue (see jobs.py); input_hash serves the result cache
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            params TEXT,
+            input_hash TEXT,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            result TEXT,
+            artifact TEXT,
+            error TEXT,
+            submitted_at TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_input ON jobs(input_hash, status)")
+
+def _job_workers(cursor):
+    # Jobs are claimed by job_worker.py processes; the pid lets JobQueue spot
+    # a worker that died mid-job
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(jobs)")]
+    if 'worker_pid' not in columns:
+        cursor.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, id)")
+
+def _job_locations(cursor):
+    # Each job carries its artifact and model directories, so any worker can run it
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(jobs)")]
+    for column in ('artifact_dir', 'model_dir'):
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE jobs ADD COLUMN {column} TEXT")
+
+def _drop_key_indexes(cursor):
+    # Earlier builds of migration 4 added these; both lead with the primary key,
+    # so they duplicated its index and only slowed bulk inserts
+    cursor.execute("DROP INDEX IF EXISTS idx_employees_id_ot_fatigue")
+    cursor.execute("DROP INDEX IF EXISTS idx_predictions_id_risk")
+
+MIGRATIONS = [
+    (1, "base schema", _base_schema),
+    (2, "declared predictions schema", _declared_predictions),
+    (3, "risk registry indexes", _registry_indexes),
+    (4, "covering indexes for dashboard filters", _covering_indexes),
+    (5, "background jobs", _jobs),
+    (6, "job worker ownership", _job_workers),
+    (7, "per-job artifact and model directories", _job_locations),
+    (8, "drop indexes duplicating primary keys", _drop_key_indexes),
+]
+LATEST = MIGRATIONS[-1][0]
+
+def current_version(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP
+        )
+    ''')
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+def migrate(conn, target=LATEST):
+    """Applies pending migrations up to target; returns the versions applied."""
+    if current_version(conn) >= target:
+        return []
+
+    applied = []
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while we waited for the write lock
+        version = current_version(conn)
+        cursor = conn.cursor()
+        for number, description, step in MIGRATIONS:
+            if version < number <= target:
+                step(cursor)
+                cursor.execute("INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                               (number, description, datetime.now().isoformat(sep=' ')))
+                applied.append(number)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return applied
@@ -2,50 +2,332 @@ import joblib
 import pandas as pd
 import numpy as np
 import os
+import hashlib
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+class ArtifactUnavailable(RuntimeError):
+    """An artifact whose load already failed (and was reported) in this process."""
+
+class ModelRegistry:
+    """
+    Process-wide artifact cache.
+    Each pickle is deserialized once per process, on first use, and shared by
+    every Model instance (and so every Streamlit session). Large arrays are
+    memory-mapped read-only instead of copied into each process heap. Entries
+    are keyed on the file's identity (inode, size, mtime), so a retrained
+    artifact swapped into place is picked up on the next access.
+    """
+    _artifacts = {}
+    _failures = {}
+    _metrics = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+    @classmethod
+    def get(cls, path, mmap_mode='r'):
+        key = os.path.abspath(path)
+        stamp = cls._stamp(key)
+        entry = cls._artifacts.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+
+        with cls._lock:
+            # Failed loads are remembered until the file changes, so hot paths
+            # don't retry the disk read
+            failure = cls._failures.get(key)
+            if failure is not None and failure[0] == stamp:
+                raise ArtifactUnavailable(key) from failure[1]
+            # Another thread may have finished the load while we waited
+            entry = cls._artifacts.get(key)
+            if entry is None or entry[0] != stamp:
+                start = time.perf_counter()
+                try:
+                    artifact = joblib.load(key, mmap_mode=mmap_mode)
+                except Exception as e:
+                    cls._failures[key] = (stamp, e)
+                    raise
+                cls._failures.pop(key, None)
+                entry = cls._artifacts[key] = (stamp, artifact)
+                cls._metrics[key] = {
+                    'artifact': os.path.basename(key),
+                    'load_seconds': round(time.perf_counter() - start, 4),
+                    'file_bytes': os.path.getsize(key),
+                    'mmap_mode': mmap_mode,
+                }
+            return entry[1]
+
+    @classmethod
+    def derived(cls, key, build, sources=()):
+        """
+        Cache a value computed from loaded artifacts (e.g. compiled lookup
+        tables); it is rebuilt when any of the `sources` files change.
+        """
+        stamp = tuple(cls._stamp(os.path.abspath(path)) for path in sources)
+        entry = cls._artifacts.get(key)
+        if entry is None or entry[0] != stamp:
+            entry = (stamp, build())
+            with cls._lock:
+                cls._artifacts[key] = entry
+        return entry[1]
+
+    @classmethod
+    def metrics(cls):
+        return pd.DataFrame(list(cls._metrics.values()))
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._artifacts.clear()
+            cls._failures.clear()
+            cls._metrics.clear()
 
 class Model:
+    ARTIFACTS = {
+        'clf': 'adv_model.pkl',
+        'scaler': 'adv_scaler.pkl',
+        'encoders': 'adv_encoders.pkl',
+        'importance': 'adv_importance.pkl',
+        'feature_names': 'adv_features.pkl',
+    }
+    # Probability cut-offs for the High / Medium risk tiers
+    HIGH_RISK = 0.6
+    MEDIUM_RISK = 0.3
+
     def __init__(self, model_dir="src"):
+        # Artifacts are resolved lazily through the registry on first access
         self.model_dir = model_dir
-        self.load_artifacts()
 
-    def load_artifacts(self):
+    def _artifact(self, name):
         try:
-            self.clf = joblib.load(os.path.join(self.model_dir, 'adv_model.pkl'))
-            self.scaler = joblib.load(os.path.join(self.model_dir, 'adv_scaler.pkl'))
-            self.encoders = joblib.load(os.path.join(self.model_dir, 'adv_encoders.pkl'))
-            self.importance = joblib.load(os.path.join(self.model_dir, 'adv_importance.pkl'))
-            self.feature_names = joblib.load(os.path.join(self.model_dir, 'adv_features.pkl'))
+            return ModelRegistry.get(os.path.join(self.model_dir, self.ARTIFACTS[name]))
+        except ArtifactUnavailable:
+            # Already reported when the load first failed
+            return None
         except Exception as e:
             print(f"Error loading models: {e}")
-            self.clf = None
+            return None
+
+    clf = property(lambda self: self._artifact('clf'))
+    scaler = property(lambda self: self._artifact('scaler'))
+    encoders = property(lambda self: self._artifact('encoders'))
+    importance = property(lambda self: self._artifact('importance'))
+    feature_names = property(lambda self: self._artifact('feature_names'))
+
+    def load_artifacts(self):
+        """Eagerly warm every artifact (e.g. at service start-up) and return load metrics."""
+        for name in self.ARTIFACTS:
+            self._artifact(name)
+        return ModelRegistry.metrics()
+
+    def missing_artifacts(self):
+        """Names of the artifacts that could not be loaded from model_dir."""
+        return [name for name in self.ARTIFACTS if self._artifact(name) is None]
+
+    def ensure_loaded(self):
+        """Like load_artifacts, but raises FileNotFoundError if any artifact failed to load."""
+        missing = self.missing_artifacts()
+        if missing:
+            raise FileNotFoundError(f"missing model artifacts in {self.model_dir}: {', '.join(missing)}")
+        return ModelRegistry.metrics()
+
+    def compile(self):
+        """
+        Compiled Inference Tables.
+        Each LabelEncoder becomes a category Index (labels -> integer codes) and
+        the StandardScaler becomes plain mean/scale vectors, built once per
+        process and shared through the registry.
+        """
+        def build():
+            scaler = self.scaler
+            n = len(self.feature_names)
+            # Feature hashes are salted with the model file identity, so a
+            # retrained model invalidates every stored hash
+            stat = os.stat(os.path.join(self.model_dir, self.ARTIFACTS['clf']))
+            salt = hashlib.md5(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:16]
+            return {
+                'hash_key': salt,
+                'features': list(self.feature_names),
+                'lookups': {col: pd.Index(le.classes_) for col, le in self.encoders.items()},
+                # A disabled step becomes the identity (x - 0, x / 1), as in transform()
+                'mean': np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean and scaler.mean_ is not None
+                        else np.zeros(n),
+                'scale': np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std and scaler.scale_ is not None
+                         else np.ones(n),
+            }
+        key = ('compiled', os.path.abspath(self.model_dir))
+        sources = [os.path.join(self.model_dir, self.ARTIFACTS[name])
+                   for name in ('clf', 'scaler', 'encoders', 'feature_names')]
+        return ModelRegistry.derived(key, build, sources)
+
+    def encode(self, df):
+        """
+        Fills one preallocated float64 array straight from the input columns,
+        with categorical codes from the lookup tables (unscaled).
+        """
+        compiled = self.compile()
+        X = np.empty((len(df), len(compiled['features'])), dtype=np.float64)
+
+        for j, col in enumerate(compiled['features']):
+            values = df[col]
+            categories = compiled['lookups'].get(col)
+            if categories is None:
+                X[:, j] = values.to_numpy(dtype=np.float64)
+                continue
+            # Factorize once, then map the few distinct labels through the lookup
+            # table; labels are compared as str, like the encoders were fitted
+            row_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+            uniques = pd.Index(uniques, dtype=object).astype(str)
+            table = categories.get_indexer(uniques)
+            if (table < 0).any():
+                unseen = sorted(str(u) for u in uniques[table < 0])
+                raise ValueError(f"{col} contains previously unseen labels: {unseen}")
+            X[:, j] = table[row_codes]
+        return X
+
+    def scale(self, X):
+        """
+        Fused (X - mean) / scale, in place, in the same operation order as
+        StandardScaler.transform so results are identical. Returns a
+        C-contiguous float32 matrix, the dtype the forest scores in.
+        """
+        compiled = self.compile()
+        X -= compiled['mean']
+        X /= compiled['scale']
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def feature_matrix(self, df):
+        return self.scale(self.encode(df))
+
+    def feature_hashes(self, X):
+        """64-bit hash of each encoded (unscaled) feature row, as signed int64 for SQLite."""
+        hashed = pd.util.hash_pandas_object(pd.DataFrame(X), index=False,
+                                            hash_key=self.compile()['hash_key'])
+        return hashed.to_numpy().view(np.int64)
+
+    @classmethod
+    def risk_labels(cls, probs):
+        return np.select([probs > cls.HIGH_RISK, probs > cls.MEDIUM_RISK], ["High", "Medium"], "Low")
+
+    def predict_attrition(self, df, with_hash=False):
+        clf = self.clf
+        if clf is None: return None
+
+        # Encode + scale in one pass, then predict
+        X = self.encode(df)
+        hashes = self.feature_hashes(X) if with_hash else None
+        probs = clf.predict_proba(self.scale(X))[:, 1]
 
-    def predict_attrition(self, df):
-        if self.clf is None: return None
-        
-        X = df.copy()
-        # Drop only non-feature identification columns
-        cols_to_drop = ['Employee_ID', 'Attrition', 'last_updated']
-        X = X.drop([c for c in cols_to_drop if c in X.columns], axis=1)
-        
-        # Proper order
-        X = X[self.feature_names]
-        
-        # Encode
-        for col, le in self.encoders.items():
-            X[col] = le.transform(X[col].astype(str))
-            
-        # Scale
-        X_scaled = self.scaler.transform(X)
-        
-        # Predict
-        probs = self.clf.predict_proba(X_scaled)[:, 1]
-        
         results = pd.DataFrame({
             'Employee_ID': df['Employee_ID'],
             'Probability': probs,
-            'Attrition_Risk': ["High" if p > 0.6 else "Medium" if p > 0.3 else "Low" for p in probs]
+            'Attrition_Risk': self.risk_labels(probs)
         })
+        if with_hash:
+            results['Feature_Hash'] = hashes
+            results['Scored_At'] = str(datetime.now())
         return results
 
+    def changed_mask(self, df, state):
+        """
+        True for employees that need re-scoring: no stored prediction, a stored
+        feature hash that no longer matches, or a last_updated newer than the
+        prediction's Scored_At. `state` comes from Database.get_prediction_state().
+        """
+        state = state.drop_duplicates('Employee_ID', keep='last')
+        index = pd.Index(state['Employee_ID'].astype(str))
+        positions = index.get_indexer(df['Employee_ID'].astype(str))
+        known = positions >= 0
+
+        changed = ~known
+        stored = state['Feature_Hash'].to_numpy(dtype=np.int64)[positions[known]]
+        changed[known] = stored != self.feature_hashes(self.encode(df.iloc[np.flatnonzero(known)]))
+
+        if 'last_updated' in df.columns:
+            updated = pd.to_datetime(df['last_updated'].to_numpy()[known], errors='coerce')
+            scored = pd.to_datetime(state['Scored_At'].to_numpy()[positions[known]], errors='coerce')
+            changed[known] |= np.asarray(updated > scored)
+        return changed
+
+    def predict_incremental(self, df, state, **batch_kwargs):
+        """
+        Incremental Re-scoring.
+        Scores only the employees flagged by changed_mask (with fresh feature
+        hashes) through predict_attrition_batched; pair with
+        db.save_predictions(chunk, mode="upsert") as the on_chunk sink.
+        """
+        if self.clf is None: return None
+        delta = df[self.changed_mask(df, state)]
+        if delta.empty:
+            if batch_kwargs.get('on_chunk'): return 0
+            return pd.DataFrame(columns=['Employee_ID', 'Probability', 'Attrition_Risk',
+                                         'Feature_Hash', 'Scored_At'])
+        return self.predict_attrition_batched(delta, with_hash=True, **batch_kwargs)
+
+    def predict_attrition_batched(self, df, chunk_size=50000, workers=None,
+                                  executor="thread", on_chunk=None, with_hash=False):
+        """
+        Chunked Batch Scoring.
+        Splits the workforce into chunks scored in parallel on a thread (or
+        process) pool; at most 2 x workers chunks are in flight. Inputs that fit
+        in one chunk parallelise across the forest's trees instead (n_jobs).
+        If on_chunk is given, each result chunk is handed to it as soon as it
+        finishes (e.g. db.save_predictions(chunk, mode="append")) and only the
+        row count is returned, so results never accumulate in memory.
+        """
+        clf = self.clf
+        if clf is None: return None
+        workers = workers or os.cpu_count() or 1
+
+        if len(df) <= chunk_size:
+            with joblib.parallel_config(n_jobs=workers):
+                results = self.predict_attrition(df, with_hash)
+            if on_chunk is None: return results
+            on_chunk(results)
+            return len(results)
+
+        pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        collected = []
+        scored = 0
+        with pool_cls(max_workers=workers) as pool:
+            pending = deque()
+            for start in range(0, len(df), chunk_size):
+                chunk = df.iloc[start:start + chunk_size]
+                if executor == "process":
+                    pending.append(pool.submit(_score_chunk, self.model_dir, chunk, with_hash))
+                else:
+                    pending.append(pool.submit(partial(self.predict_attrition, chunk, with_hash)))
+                # Bound memory: drain the oldest chunk once the window is full
+                if len(pending) >= 2 * workers:
+                    scored += self._emit(pending.popleft().result(), on_chunk, collected)
+            while pending:
+                scored += self._emit(pending.popleft().result(), on_chunk, collected)
+
+        if on_chunk is not None: return scored
+        return pd.concat(collected)
+
+    @staticmethod
+    def _emit(results, on_chunk, collected):
+        if on_chunk is None:
+            collected.append(results)
+        else:
+            on_chunk(results)
+        return len(results)
+
     def get_importance_df(self):
         return self.importance
+
+def _score_chunk(model_dir, chunk, with_hash=False):
+    # Process-pool entry point; artifacts load once per worker via the registry
+    return Model(model_dir).predict_attrition(chunk, with_hash)
@@ -1,18 +1,126 @@
 import pandas as pd
 import numpy as np
 
+def _round2(values):
+    # np.round scales by 100 and can disagree with Python's round() on values
+    # sitting on a half-cent; resolve only those ties the exact (scalar) way.
+    values = np.atleast_1d(values)
+    scaled = values * 100
+    rounded = np.round(scaled) / 100
+    ties = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if ties.any():
+        rounded[ties] = [round(float(v), 2) for v in values[ties]]
+    return rounded
+
 class Optimizer:
     @staticmethod
-    def calculate_fatigue(row):
+    def fatigue_scores(overtime, shift, distance, age, leave):
+        """
+        Vectorized Fatigue Engine.
+        Scores whole NumPy columns at once with the operational weights below.
+        """
+        overtime = np.asarray(overtime, dtype=float)
+        distance = np.asarray(distance, dtype=float)
+        age = np.asarray(age, dtype=float)
+        leave = np.asarray(leave, dtype=float)
+
         # Operational Weights
-        ot_val = (row['Overtime_Hours'] / 40) * 40
-        night_val = 25 if row['Shift_Type'] == 'Night' else 0
-        commute_val = (row['Distance_km'] / 50) * 15
-        age_val = ((60 - row['Age']) / 40) * 10
-        leave_val = (row['Last_Month_Leave'] / 10) * 10
-        
+        ot_val = (overtime / 40) * 40
+        night_val = np.where(np.asarray(shift) == 'Night', 25, 0)
+        commute_val = (distance / 50) * 15
+        age_val = ((60 - age) / 40) * 10
+        leave_val = (leave / 10) * 10
+
         score = ot_val + night_val + commute_val + age_val + leave_val
-        return min(round(score, 2), 100)
+        return np.minimum(_round2(score), 100)
+
+    @staticmethod
+    def calculate_fatigue_batch(df):
+        scores = Optimizer.fatigue_scores(
+            df['Overtime_Hours'].to_numpy(), df['Shift_Type'].to_numpy(),
+            df['Distance_km'].to_numpy(), df['Age'].to_numpy(),
+            df['Last_Month_Leave'].to_numpy()
+        )
+        return pd.Series(scores, index=df.index, name='Fatigue_Score')
+
+    @staticmethod
+    def calculate_fatigue(row):
+        # Single-row wrapper over the vectorized engine
+        return float(Optimizer.fatigue_scores(
+            row['Overtime_Hours'], row['Shift_Type'], row['Distance_km'],
+            row['Age'], row['Last_Month_Leave']
+        )[0])
+
+    @staticmethod
+    def apply_rules(shift, overtime, rules, default_action):
+        """
+        Columnar Rule Engine.
+        Rules are evaluated in order like an if/elif chain; each row is handled
+        by the first rule whose 'when' mask it matches. A rule may rotate Night
+        to Morning ('rotate' label) and cap OT at 'ot_cap' ('cap' label, either
+        appended to or replacing the action depending on 'append').
+        """
+        shift = np.asarray(shift, dtype=object)
+        overtime = np.asarray(overtime)
+        new_shift = shift.copy()
+        new_ot = overtime.copy()
+        action = np.full(len(shift), default_action, dtype=object)
+
+        pending = np.ones(len(shift), dtype=bool)
+        for rule in rules:
+            hit = pending & np.asarray(rule['when'], dtype=bool)
+            pending &= ~hit
+
+            if rule.get('rotate'):
+                rotate = hit & (shift == 'Night')
+                new_shift[rotate] = 'Morning'
+                action[rotate] = rule['rotate']
+
+            capped = hit & (overtime > rule['ot_cap'])
+            new_ot[capped] = rule['ot_cap']
+            if rule.get('append'):
+                action[capped] = action[capped] + rule['cap']
+            else:
+                action[capped] = rule['cap']
+
+        return new_shift, new_ot, action
+
+    @staticmethod
+    def join_predictions(df, predictions, columns=('Attrition_Risk',)):
+        """
+        Keyed Join Layer.
+        Aligns prediction columns to employees by Employee_ID via a hash index
+        (no positional assignment, no sorting). Returns the joined frame and a
+        report of employees without a prediction ('unmatched') and predictions
+        whose employee is no longer on the roster ('stale').
+        """
+        emp_keys = df['Employee_ID'].astype(str)
+        pred_keys = predictions['Employee_ID'].astype(str)
+
+        # Last write wins if the predictions table holds duplicate IDs
+        latest = ~pred_keys.duplicated(keep='last').to_numpy()
+        index = pd.Index(pred_keys.to_numpy()[latest])
+        positions = index.get_indexer(emp_keys)
+        matched = positions >= 0
+
+        joined = {}
+        for col in columns:
+            values = predictions[col].to_numpy()[latest]
+            aligned = np.full(len(df), None, dtype=object)
+            aligned[matched] = values[positions[matched]]
+            joined[col] = aligned
+        merged = df.assign(**joined)
+
+        # Predictions never hit by an employee lookup are stale
+        used = np.zeros(len(index), dtype=bool)
+        used[positions[matched]] = True
+
+        report = {
+            'matched': int(matched.sum()),
+            'unmatched': emp_keys[~matched].tolist(),
+            'stale': index[~used].tolist(),
+        }
+        return merged, report
 
     @staticmethod
     def run_optimization(df, predictions):
@@ -20,39 +128,31 @@ class Optimizer:
         AI-Assisted Constraint-Based Optimization.
         Constraints: Max 8h OT, No Night shifts for High Risk, Row Rotation.
         """
-        merged = df.copy()
-        merged['Attrition_Risk'] = predictions['Attrition_Risk']
-        
-        recommends = []
-        for _, row in merged.iterrows():
-            rec_shift = row['Shift_Type']
-            rec_ot = row['Overtime_Hours']
-            action = "Maintained"
-            
+        merged, report = Optimizer.join_predictions(df, predictions)
+
+        fatigue = merged['Fatigue_Score'].to_numpy()
+        rules = [
             # Constraint 1: High Fatigue (>75) -> Rotate from Night
-            if row['Fatigue_Score'] > 75:
-                if row['Shift_Type'] == 'Night':
-                    rec_shift = 'Morning'
-                    action = "Rotated to Morning"
-                if row['Overtime_Hours'] > 8:
-                    rec_ot = 8
-                    action += " | Capped OT 8h"
-            
+            {'when': fatigue > 75, 'rotate': "Rotated to Morning",
+             'ot_cap': 8, 'cap': " | Capped OT 8h", 'append': True},
             # Constraint 2: High Attrition Risk -> Stabilization
-            elif row['Attrition_Risk'] == 'High':
-                if row['Overtime_Hours'] > 10:
-                    rec_ot = 10
-                    action = "Risk Cap applied"
-            
-            recommends.append({
-                'Employee_ID': row['Employee_ID'],
-                'Fatigue': row['Fatigue_Score'],
-                'Risk': row['Attrition_Risk'],
-                'Current_Shift': row['Shift_Type'],
-                'Optimal_Shift': rec_shift,
-                'Current_OT': row['Overtime_Hours'],
-                'Optimal_OT': rec_ot,
-                'Action': action
-            })
-            
-        return pd.DataFrame(recommends)
+            {'when': (merged['Attrition_Risk'] == 'High').to_numpy(),
+             'ot_cap': 10, 'cap': "Risk Cap applied"},
+        ]
+        rec_shift, rec_ot, action = Optimizer.apply_rules(
+            merged['Shift_Type'].to_numpy(), merged['Overtime_Hours'].to_numpy(),
+            rules, "Maintained"
+        )
+
+        result = pd.DataFrame({
+            'Employee_ID': merged['Employee_ID'].to_numpy(),
+            'Fatigue': fatigue,
+            'Risk': merged['Attrition_Risk'].to_numpy(),
+            'Current_Shift': merged['Shift_Type'].to_numpy(),
+            'Optimal_Shift': rec_shift,
+            'Current_OT': merged['Overtime_Hours'].to_numpy(),
+            'Optimal_OT': rec_ot,
+            'Action': action
+        })
+        result.attrs['join_report'] = report
+        return result
@@ -1,8 +1,43 @@
 from fpdf import FPDF
+import numpy as np
 import datetime
 import os
 
-class ReportGenerator(FPDF):
+class TableLayout:
+    """Column headers, widths and row geometry for one registry table, built once and reused."""
+
+    def __init__(self, headers, widths, font_size, row_height=8, header_height=10):
+        self.headers = headers
+        self.widths = widths
+        self.font_size = font_size
+        self.row_height = row_height
+        self.header_height = header_height
+        self.offsets = np.concatenate([[0], np.cumsum(widths)])
+        # Baseline of the text inside a row
+        self.baseline = row_height / 2 + font_size * 0.35 / 2
+
+    def fit(self, doc, col, values):
+        """
+        Truncates values that would overflow their column. Each distinct string
+        is measured once per call; the cache is local so layouts shared across
+        exports (and long-lived job workers) don't accumulate every ID seen.
+        """
+        limit = self.widths[col] - 2
+        fitted = {}
+        out = []
+        for v in values:
+            f = fitted.get(v)
+            if f is None:
+                f = v
+                if doc.get_string_width(v) > limit:
+                    while f and doc.get_string_width(f + '...') > limit:
+                        f = f[:-1]
+                    f += '...'
+                fitted[v] = f
+            out.append(f)
+        return out
+
+class ReportDocument(FPDF):
     def header(self):
         self.set_font('Arial', 'B', 16)
         self.cell(0, 10, 'AI-Driven Fatigue-Aware Shift Optimization System', 0, 1, 'C')
@@ -15,55 +50,93 @@ class ReportGenerator(FPDF):
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()} | Generated by ShiftSync AI', 0, 0, 'C')
 
-    def generate_pdf(self, df, predictions, optimized, output_path="reports/Executive_Summary.pdf"):
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        self.add_page()
-        
+    def table_header(self, layout):
+        self.set_font('Arial', 'B', 10)
+        for header, width in zip(layout.headers, layout.widths):
+            self.cell(width, layout.header_height, header, 1)
+        self.ln()
+
+    def table(self, layout, columns):
+        """
+        Streams every row of `columns` (equal-length lists of strings), page by
+        page. Rows are placed with text() and one set of grid lines per page
+        instead of a bordered cell() per value, which is what keeps
+        tens-of-thousands-row registries fast.
+        """
+        n = len(columns[0]) if columns else 0
+        bottom = self.h - 20  # clear of the footer
+        start = 0
+        self.table_header(layout)
+        while True:
+            self.set_font('Arial', '', layout.font_size)
+            top = self.get_y()
+            rows = min(n - start, max(int((bottom - top) // layout.row_height), 0))
+            x0 = self.l_margin
+            for r in range(rows):
+                y = top + r * layout.row_height + layout.baseline
+                for c, values in enumerate(columns):
+                    self.text(x0 + layout.offsets[c] + 1, y, values[start + r])
+            if rows:
+                end = top + rows * layout.row_height
+                for r in range(1, rows + 1):
+                    self.line(x0, top + r * layout.row_height, x0 + layout.offsets[-1], top + r * layout.row_height)
+                for offset in layout.offsets:
+                    self.line(x0 + offset, top, x0 + offset, end)
+                self.set_y(end)
+            start += rows
+            if start >= n:
+                break
+            self.add_page()
+            self.table_header(layout)
+
+class ReportGenerator:
+    """
+    Executive PDF Report Engine.
+    Every call builds a fresh document, so repeated exports never append to
+    an earlier one, and renders the complete registries from column arrays.
+    """
+    RISK_TABLE = TableLayout(['Employee ID', 'Risk Level', 'Probability'], [40, 60, 50], font_size=10)
+    ROSTER_TABLE = TableLayout(['EMP ID', 'Current Shift', 'Optimal Shift', 'Action Taken'],
+                               [30, 40, 40, 80], font_size=9)
+
+    def generate_pdf(self, df, predictions, optimized, output_path=None):
+        """Writes to output_path and returns it, or returns the PDF bytes when no path is given."""
+        doc = ReportDocument()
+        doc.add_page()
+        high_risk = predictions[predictions['Attrition_Risk'] == 'High'].sort_values('Probability', ascending=False)
+
         # Section 1: Workforce Overview
-        self.set_font('Arial', 'B', 14)
-        self.cell(0, 10, '1. Workforce Overview', 0, 1)
-        self.set_font('Arial', '', 12)
-        self.cell(0, 10, f'- Total Workforce Analyzed: {len(df)} Employees', 0, 1)
-        self.cell(0, 10, f'- High Risk Instances Detected: {len(predictions[predictions["Attrition_Risk"] == "High"])}', 0, 1)
-        self.cell(0, 10, f'- Avg Workforce Fatigue: {df["Fatigue_Score"].mean():.2f}', 0, 1)
-        self.ln(10)
+        doc.set_font('Arial', 'B', 14)
+        doc.cell(0, 10, '1. Workforce Overview', 0, 1)
+        doc.set_font('Arial', '', 12)
+        doc.cell(0, 10, f'- Total Workforce Analyzed: {len(df)} Employees', 0, 1)
+        doc.cell(0, 10, f'- High Risk Instances Detected: {len(high_risk)}', 0, 1)
+        doc.cell(0, 10, f'- Avg Workforce Fatigue: {df["Fatigue_Score"].mean():.2f}', 0, 1)
+        doc.ln(10)
 
         # Section 2: High Risk Employees Table
-        self.set_font('Arial', 'B', 14)
-        self.cell(0, 10, '2. High Attrition Risk Registry', 0, 1)
-        self.set_font('Arial', 'B', 10)
-        self.cell(40, 10, 'Employee ID', 1)
-        self.cell(60, 10, 'Risk Level', 1)
-        self.cell(50, 10, 'Probability', 1)
-        self.ln()
+        doc.set_font('Arial', 'B', 14)
+        doc.cell(0, 10, '2. High Attrition Risk Registry', 0, 1)
+        doc.set_font('Arial', '', self.RISK_TABLE.font_size)
+        doc.table(self.RISK_TABLE, [
+            self.RISK_TABLE.fit(doc, 0, high_risk['Employee_ID'].astype(str).tolist()),
+            high_risk['Attrition_Risk'].astype(str).tolist(),
+            np.char.mod('%.2f%%', high_risk['Probability'].to_numpy(dtype=float) * 100).tolist(),
+        ])
 
-        self.set_font('Arial', '', 10)
-        high_risk = predictions[predictions['Attrition_Risk'] == 'High'].head(15)
-        for _, row in high_risk.iterrows():
-            self.cell(40, 8, str(row['Employee_ID']), 1)
-            self.cell(60, 8, str(row['Attrition_Risk']), 1)
-            self.cell(50, 8, f"{row['Probability']*100:.2f}%", 1)
-            self.ln()
-            
-        self.add_page()
+        doc.add_page()
         # Section 3: Optimization Recommendations
-        self.set_font('Arial', 'B', 14)
-        self.cell(0, 10, '3. Critical Roster Optimization', 0, 1)
-        self.set_font('Arial', 'B', 10)
-        self.cell(30, 10, 'EMP ID', 1)
-        self.cell(40, 10, 'Current Shift', 1)
-        self.cell(40, 10, 'Optimal Shift', 1)
-        self.cell(80, 10, 'Action Taken', 1)
-        self.ln()
-
-        self.set_font('Arial', '', 9)
-        changed = optimized[optimized['Action'] != 'Maintained'].head(20)
-        for _, row in changed.iterrows():
-            self.cell(30, 8, str(row['Employee_ID']), 1)
-            self.cell(40, 8, str(row['Current_Shift']), 1)
-            self.cell(40, 8, str(row['Optimal_Shift']), 1)
-            self.cell(80, 8, str(row['Action']), 1)
-            self.ln()
+        doc.set_font('Arial', 'B', 14)
+        doc.cell(0, 10, '3. Critical Roster Optimization', 0, 1)
+        changed = optimized[optimized['Action'] != 'Maintained']
+        doc.set_font('Arial', '', self.ROSTER_TABLE.font_size)
+        doc.table(self.ROSTER_TABLE, [
+            self.ROSTER_TABLE.fit(doc, i, changed[col].astype(str).tolist())
+            for i, col in enumerate(['Employee_ID', 'Current_Shift', 'Optimal_Shift', 'Action'])
+        ])
 
-        self.output(output_path)
+        if output_path is None:
+            return bytes(doc.output())
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        doc.output(output_path)
         return output_path
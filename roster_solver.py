@@ -0,0 +1,203 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import linprog, milp, LinearConstraint, Bounds
+from optimizer import Optimizer
+
+SHIFTS = ['Morning', 'Evening', 'Night']
+NIGHT = SHIFTS.index('Night')
+
+class RosterSolver:
+    """
+    Exact Coverage-Aware Roster Solver (LP/MILP via scipy's HiGHS).
+    Per department it assigns every employee exactly one shift and an OT
+    allowance so that each shift keeps its required headcount and the
+    department's OT demand is still met, while minimizing risk-weighted
+    projected fatigue:
+
+        sum_i (1 + risk_weight * p_i) * (25 * night_i + OT_i)
+              + churn * moved_i + ot_change * |OT_i - current OT_i|
+
+    using the same night/OT weights as Optimizer.fatigue_scores. Shortfalls in
+    coverage or OT are allowed only through heavily penalized slack, so the
+    model is always feasible and any gap is reported instead of failing.
+
+    max_ot is the per-employee OT ceiling. By default (None) it is each
+    employee's current OT, so the solver never adds hours: it only applies the
+    fatigue/risk caps and reports the hours nobody could pick up as
+    ot_shortfall. Pass a number of hours to let it move OT onto lower-risk
+    workers up to that ceiling; anyone currently above it is cut to it.
+
+    The two parts share no constraints, so they are solved separately, which
+    is exact. The shift part is a transportation problem: its constraint
+    matrix is totally unimodular, so the LP relaxation already has an integral
+    optimum. It is solved as an LP and only falls back to branch-and-bound
+    (milp) if a fractional value ever appears.
+    """
+    NIGHT_WEIGHT = 25
+    SHORTFALL_PENALTY = 1e4
+
+    def __init__(self, risk_weight=2.0, churn_penalty=1.0, ot_change_penalty=0.25,
+                 max_ot=None, fatigue_ot_cap=8, risk_ot_cap=10, time_limit=60):
+        self.risk_weight = risk_weight
+        self.churn_penalty = churn_penalty
+        self.ot_change_penalty = ot_change_penalty
+        self.max_ot = max_ot
+        self.fatigue_ot_cap = fatigue_ot_cap
+        self.risk_ot_cap = risk_ot_cap
+        self.time_limit = time_limit
+
+    def ot_caps(self, fatigue, risk, overtime):
+        # Same thresholds as the rule engine: fatigue > 75 -> 8h, High risk -> 10h
+        if self.max_ot is None:
+            caps = np.asarray(overtime, dtype=float).copy()
+        else:
+            caps = np.full(len(fatigue), float(self.max_ot))
+        caps = np.where(risk == 'High', np.minimum(caps, self.risk_ot_cap), caps)
+        return np.where(fatigue > 75, np.minimum(caps, self.fatigue_ot_cap), caps)
+
+    def assign_shifts(self, shift_cost, required, allowed=None):
+        """
+        shift_cost: (n, 3) cost of each shift per employee; required: (3,)
+        headcount per shift; allowed: optional (n, 3) bool mask of permitted
+        shifts (e.g. rest rules). Returns (shift index per employee, coverage slack).
+        """
+        n = len(shift_cost)
+        n_x = n * 3
+        # Variable layout: x[i, s] | coverage slack u[s]
+        c = np.concatenate([shift_cost.ravel(), np.full(3, self.SHORTFALL_PENALTY)])
+        x_ub = np.ones(n_x) if allowed is None else allowed.ravel().astype(float)
+        bounds = Bounds(np.zeros(len(c)), np.concatenate([x_ub, np.full(3, np.inf)]))
+
+        rows = np.arange(n_x)
+        # Each employee works exactly one shift
+        assign = sparse.csr_matrix((np.ones(n_x), (rows // 3, rows)), shape=(n, len(c)))
+        # Shift coverage: assigned + slack >= required
+        cover = sparse.csr_matrix(
+            (np.ones(n_x + 3), (np.concatenate([rows % 3, np.arange(3)]),
+                                np.concatenate([rows, n_x + np.arange(3)]))),
+            shape=(3, len(c)))
+        constraints = [LinearConstraint(assign, 1, 1), LinearConstraint(cover, required, np.inf)]
+        options = {'time_limit': self.time_limit}
+
+        res = linprog(c, A_ub=-cover, b_ub=-np.asarray(required, dtype=float), A_eq=assign,
+                      b_eq=np.ones(n), bounds=list(zip(bounds.lb, bounds.ub)),
+                      method='highs-ipm', options=options)
+        x = None if res.x is None else res.x[:n_x]
+        if x is None or np.abs(x - np.round(x)).max() > 1e-6:
+            res = milp(c, constraints=constraints, bounds=bounds, options=options,
+                       integrality=np.concatenate([np.ones(n_x), np.zeros(3)]))
+            if res.x is None:
+                raise RuntimeError(f"Roster solver failed: {res.message}")
+            x = res.x[:n_x]
+        return x.reshape(n, 3).argmax(axis=1), np.round(res.x[n_x:], 3)
+
+    def allocate_ot(self, ot_cost, ot_base, ot_cap, ot_demand):
+        """
+        Continuous OT allocation: new OT = base + up - down, within [0, cap],
+        total >= demand (less penalized slack). Returns (hours, OT slack).
+        """
+        n = len(ot_cost)
+        # Variable layout: up[i] | down[i] | OT slack v
+        c = np.concatenate([ot_cost + self.ot_change_penalty, -ot_cost + self.ot_change_penalty,
+                            [self.SHORTFALL_PENALTY]])
+        # Bounds keep base + up - down inside [0, cap] without extra rows
+        lb = np.concatenate([np.zeros(n), np.maximum(ot_base - ot_cap, 0), [0]])
+        ub = np.concatenate([np.maximum(ot_cap - ot_base, 0), ot_base, [np.inf]])
+        demand_row = -np.concatenate([np.ones(n), -np.ones(n), [1]])[None, :]
+
+        res = linprog(c, A_ub=sparse.csr_matrix(demand_row), b_ub=[-(ot_demand - ot_base.sum())],
+                      bounds=list(zip(lb, ub)), method='highs',
+                      options={'time_limit': self.time_limit})
+        if res.x is None:
+            raise RuntimeError(f"OT allocation failed: {res.message}")
+        hours = ot_base + res.x[:n] - res.x[n:2 * n]
+        return np.round(np.clip(hours, 0, None), 2), round(float(res.x[-1]), 3)
+
+    def solve_department(self, shift_cost, required, ot_cost, ot_base, ot_cap, ot_demand, allowed=None):
+        start = time.perf_counter()
+        shifts, cover_slack = self.assign_shifts(shift_cost, required, allowed)
+        hours, ot_slack = self.allocate_ot(ot_cost, ot_base, ot_cap, ot_demand)
+        info = {
+            'solve_seconds': round(time.perf_counter() - start, 3),
+            'coverage_shortfall': cover_slack.tolist(),
+            'ot_shortfall': ot_slack,
+        }
+        return shifts, hours, info
+
+    def solve(self, df, predictions, coverage=None, ot_demand=None):
+        """
+        Decomposes the site by Department and solves each one independently.
+        coverage: optional {(department, shift): headcount}; defaults to today's
+        headcount per department/shift. ot_demand: optional {department: hours};
+        defaults to today's total OT hours per department.
+        """
+        merged, join_report = Optimizer.join_predictions(df, predictions, columns=('Attrition_Risk', 'Probability'))
+        risk = merged['Attrition_Risk'].to_numpy()
+        prob = pd.to_numeric(merged['Probability'], errors='coerce').fillna(0).to_numpy()
+        fatigue = merged['Fatigue_Score'].to_numpy(dtype=float)
+        overtime = merged['Overtime_Hours'].to_numpy(dtype=float)
+        current = pd.Categorical(merged['Shift_Type'], categories=SHIFTS).codes
+        caps = self.ot_caps(fatigue, risk, overtime)
+
+        weight = 1 + self.risk_weight * prob
+        shift_cost = np.zeros((len(merged), 3))
+        shift_cost[:, NIGHT] = self.NIGHT_WEIGHT * weight
+        # Small penalty for moving anyone off their current shift (unknown shifts are free)
+        known = current >= 0
+        shift_cost[known] += self.churn_penalty
+        shift_cost[np.flatnonzero(known), current[known]] -= self.churn_penalty
+
+        # Rows outside every department group (e.g. a missing Department) keep their roster
+        optimal_shift = merged['Shift_Type'].to_numpy(dtype=object).copy()
+        new_ot = overtime.copy()
+        report = []
+        for dept, idx in merged.groupby('Department', sort=True).indices.items():
+            required = np.array([
+                (coverage or {}).get((dept, s), int((current[idx] == k).sum()))
+                for k, s in enumerate(SHIFTS)
+            ], dtype=float)
+            demand = (ot_demand or {}).get(dept, float(overtime[idx].sum()))
+            assigned, hours, info = self.solve_department(
+                shift_cost[idx], required, weight[idx], overtime[idx], caps[idx], demand)
+            optimal_shift[idx] = np.array(SHIFTS, dtype=object)[assigned]
+            new_ot[idx] = hours
+            report.append({'Department': dept, 'Employees': len(idx), 'OT_Demand': demand,
+                           **{f'Required_{s}': int(r) for s, r in zip(SHIFTS, required)}, **info})
+
+        # Move the stored Fatigue_Score by the engine's change for the new shift
+        # and OT, so the projection stays on the same scale as Fatigue
+        inputs = (merged['Distance_km'].to_numpy(), merged['Age'].to_numpy(), merged['Last_Month_Leave'].to_numpy())
+        projected = np.clip(np.round(fatigue + Optimizer.fatigue_scores(new_ot, optimal_shift, *inputs)
+                                     - Optimizer.fatigue_scores(overtime, merged['Shift_Type'].to_numpy(), *inputs),
+                                     2), 0, 100)
+
+        result = pd.DataFrame({
+            'Employee_ID': merged['Employee_ID'].to_numpy(),
+            'Department': merged['Department'].to_numpy(),
+            'Fatigue': fatigue,
+            'Risk': risk,
+            'Current_Shift': merged['Shift_Type'].to_numpy(),
+            'Optimal_Shift': optimal_shift,
+            'Current_OT': overtime,
+            'Optimal_OT': new_ot,
+            'Projected_Fatigue': projected,
+            'Action': self._actions(merged['Shift_Type'].to_numpy(), optimal_shift, overtime, new_ot),
+        })
+        result.attrs['join_report'] = join_report
+        result.attrs['solver_report'] = pd.DataFrame(report)
+        return result
+
+    @staticmethod
+    def _actions(current, optimal, ot, new_ot):
+        moved = current != optimal
+        action = np.full(len(current), "", dtype=object)
+        action[moved] = "Moved to " + optimal[moved].astype(str)
+        cut = new_ot < ot - 0.01
+        added = new_ot > ot + 0.01
+        sep = np.where(moved, " | ", "")
+        action[cut] = action[cut] + sep[cut] + "OT reduced to " + np.char.mod('%gh', new_ot[cut]).astype(object)
+        action[added] = action[added] + sep[added] + "OT raised to " + np.char.mod('%gh', new_ot[added]).astype(object)
+        action[action == ""] = "Maintained"
+        return action
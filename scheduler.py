@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from optimizer import Optimizer
+from roster_solver import RosterSolver, SHIFTS, NIGHT
+
+class RotatingScheduler:
+    """
+    Multi-Week Rotating Roster Generator.
+    Plans N weeks of shift and OT assignments, one coverage-aware solve per
+    department per week, carrying each worker's fatigue forward:
+
+        carried_k = decay * carried_(k-1) + (1 - decay) * weekly score_k
+
+    where the weekly score uses the calculate_fatigue weights for that week's
+    shift and OT. Workers who are already tired or at risk cost more to put on
+    nights or OT: their cost weight is (1 + risk_weight * p) * (1 + carried / 100).
+
+    Rest rules (hard constraints):
+      - no back-to-back night weeks
+      - the week after a night week is a recovery week, with OT capped at
+        post_night_ot_cap hours
+
+    Each week's plan depends only on the state left by the previous week, so
+    update_week(k, ...) re-solves weeks k..N-1 and stops early once a
+    re-solved week reproduces the state the old plan had.
+    """
+
+    def __init__(self, df, predictions, weeks=4, decay=0.5, post_night_ot_cap=4, solver=None):
+        self.solver = solver or RosterSolver()
+        self.weeks = weeks
+        self.decay = decay
+        self.post_night_ot_cap = post_night_ot_cap
+
+        merged, _ = Optimizer.join_predictions(df, predictions, columns=('Attrition_Risk', 'Probability'))
+        self.employee_ids = merged['Employee_ID'].to_numpy()
+        self.departments = merged['Department'].to_numpy()
+        self.risk = merged['Attrition_Risk'].to_numpy()
+        self.prob = pd.to_numeric(merged['Probability'], errors='coerce').fillna(0).to_numpy()
+        self.fatigue_inputs = (merged['Distance_km'].to_numpy(), merged['Age'].to_numpy(),
+                               merged['Last_Month_Leave'].to_numpy())
+        self.dept_index = merged.groupby('Department', sort=True).indices
+        self.position = {emp: i for i, emp in enumerate(self.employee_ids.astype(str))}
+
+        # Week -1: today's roster
+        current = pd.Categorical(merged['Shift_Type'], categories=SHIFTS).codes.astype(np.int64)
+        overtime = merged['Overtime_Hours'].to_numpy(dtype=float)
+        self.initial = {
+            'shift': np.where(current < 0, SHIFTS.index('Morning'), current),
+            'ot': overtime,
+            'fatigue': merged['Fatigue_Score'].to_numpy(dtype=float),
+        }
+        # Weekly demand defaults to today's headcount per shift and OT hours per department
+        self.base_coverage = {
+            dept: np.bincount(self.initial['shift'][idx], minlength=3).astype(float)
+            for dept, idx in self.dept_index.items()
+        }
+        self.base_ot_demand = {dept: float(overtime[idx].sum()) for dept, idx in self.dept_index.items()}
+
+        self.week_config = [{} for _ in range(weeks)]
+        self.states = [None] * weeks
+
+    def plan(self):
+        self._solve_from(0)
+        return self
+
+    def update_week(self, week, coverage=None, ot_demand=None, locks=None):
+        """
+        Changes one week's inputs and re-solves only the affected horizon.
+        coverage: {(department, shift): headcount}; ot_demand: {department: hours};
+        locks: {employee_id: shift} pinned for that week.
+        Returns the list of weeks that were re-solved.
+        """
+        config = self.week_config[week]
+        if coverage: config.setdefault('coverage', {}).update(coverage)
+        if ot_demand: config.setdefault('ot_demand', {}).update(ot_demand)
+        if locks: config.setdefault('locks', {}).update(locks)
+        return self._solve_from(week)
+
+    def _solve_from(self, start):
+        solved = []
+        for week in range(start, self.weeks):
+            old = self.states[week]
+            self.states[week] = self._solve_week(week, self.states[week - 1] if week else self.initial)
+            solved.append(week)
+            # Later weeks only depend on this state; if it is unchanged they are still valid
+            if (week > start and old is not None and self.states[week + 1:] and
+                    all(self.states[w] is not None for w in range(week + 1, self.weeks)) and
+                    all(np.array_equal(old[k], self.states[week][k]) for k in ('shift', 'ot', 'fatigue'))):
+                break
+        return solved
+
+    def _solve_week(self, week, prev):
+        config = self.week_config[week]
+        prev_night = prev['shift'] == NIGHT
+
+        weight = (1 + self.solver.risk_weight * self.prob) * (1 + prev['fatigue'] / 100)
+        shift_cost = np.zeros((len(weight), 3))
+        shift_cost[:, NIGHT] = self.solver.NIGHT_WEIGHT * (1 - self.decay) * weight
+        shift_cost += self.solver.churn_penalty
+        shift_cost[np.arange(len(weight)), prev['shift']] -= self.solver.churn_penalty
+
+        # Rest rules: no back-to-back nights; recovery week caps OT
+        allowed = np.ones((len(weight), 3), dtype=bool)
+        allowed[prev_night, NIGHT] = False
+        caps = self.solver.ot_caps(prev['fatigue'], self.risk, self.initial['ot'])
+        caps = np.where(prev_night, np.minimum(caps, self.post_night_ot_cap), caps)
+
+        for emp, shift in config.get('locks', {}).items():
+            i = self.position[str(emp)]
+            allowed[i] = False
+            allowed[i, SHIFTS.index(shift)] = True
+
+        # Rows outside every department group (e.g. a missing Department) keep last week's plan
+        shift = prev['shift'].copy()
+        ot = prev['ot'].copy()
+        report = []
+        for dept, idx in self.dept_index.items():
+            required = self.base_coverage[dept].copy()
+            for k, s in enumerate(SHIFTS):
+                required[k] = config.get('coverage', {}).get((dept, s), required[k])
+            demand = config.get('ot_demand', {}).get(dept, self.base_ot_demand[dept])
+            shift[idx], ot[idx], info = self.solver.solve_department(
+                shift_cost[idx], required, (1 - self.decay) * weight[idx],
+                prev['ot'][idx], caps[idx], demand, allowed[idx])
+            report.append({'Week': week + 1, 'Department': dept, **info})
+
+        weekly = Optimizer.fatigue_scores(ot, np.array(SHIFTS, dtype=object)[shift], *self.fatigue_inputs)
+        carried = np.round(self.decay * prev['fatigue'] + (1 - self.decay) * weekly, 2)
+        return {'shift': shift, 'ot': ot, 'fatigue': carried, 'report': pd.DataFrame(report)}
+
+    def week_frame(self, week):
+        state = self.states[week]
+        prev = self.states[week - 1] if week else self.initial
+        return pd.DataFrame({
+            'Week': week + 1,
+            'Employee_ID': self.employee_ids,
+            'Department': self.departments,
+            'Shift': np.array(SHIFTS, dtype=object)[state['shift']],
+            'OT_Hours': state['ot'],
+            'Fatigue': state['fatigue'],
+            'Recovery_Week': prev['shift'] == NIGHT,
+        })
+
+    def to_frame(self):
+        return pd.concat([self.week_frame(w) for w in range(self.weeks)], ignore_index=True)
+
+    def solver_report(self):
+        return pd.concat([s['report'] for s in self.states if s is not None], ignore_index=True)
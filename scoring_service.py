@@ -0,0 +1,293 @@
+"""
+ShiftSync Scoring Service.
+A local HTTP/JSON front end to Model.predict_attrition and
+Optimizer.calculate_fatigue for supervisor tablets and the HRMS:
+
+    python scoring_service.py --port 8765 --max-batch 64 --max-wait-ms 5
+
+    POST /predict   one employee object, a list, or {"employees": [...]}
+    POST /fatigue   same payload shapes; returns Fatigue_Score only
+    GET  /health    artifact load metrics
+    GET  /metrics   p50/p95/p99 latency, throughput and batch sizes
+
+Artifacts are loaded and compiled once at start-up. Concurrent /predict
+requests are coalesced into one predict_proba call per micro-batch.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from model import Model
+from optimizer import Optimizer
+
+FATIGUE_INPUTS = ['Overtime_Hours', 'Shift_Type', 'Distance_km', 'Age', 'Last_Month_Leave']
+
+class RequestError(ValueError):
+    """Bad client payload; answered with 400."""
+
+class LatencyStats:
+    """Rolling latency samples per endpoint, plus micro-batch sizes."""
+
+    def __init__(self, window=10000, rate_window=60):
+        self.window = window
+        self.rate_window = rate_window
+        self.started = time.time()
+        self.samples = {}
+        self.totals = {}
+        self.batches = deque(maxlen=window)
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok=True):
+        with self.lock:
+            self.samples.setdefault(endpoint, deque(maxlen=self.window)).append((time.time(), seconds))
+            total = self.totals.setdefault(endpoint, {'requests': 0, 'errors': 0})
+            total['requests'] += 1
+            total['errors'] += not ok
+
+    def record_batch(self, size):
+        with self.lock:
+            self.batches.append(size)
+
+    def snapshot(self):
+        now = time.time()
+        with self.lock:
+            endpoints = {}
+            for endpoint, samples in self.samples.items():
+                finished = np.array([s[0] for s in samples])
+                latency = np.array([s[1] for s in samples]) * 1000
+                p50, p95, p99 = np.percentile(latency, [50, 95, 99])
+                recent = (finished >= now - self.rate_window).sum()
+                endpoints[endpoint] = {
+                    **self.totals[endpoint],
+                    'p50_ms': round(float(p50), 3),
+                    'p95_ms': round(float(p95), 3),
+                    'p99_ms': round(float(p99), 3),
+                    'max_ms': round(float(latency.max()), 3),
+                    'throughput_rps': round(recent / min(self.rate_window, max(now - self.started, 1e-9)), 2),
+                }
+            batches = np.array(self.batches) if self.batches else np.zeros(1)
+        return {
+            'uptime_seconds': round(now - self.started, 1),
+            'endpoints': endpoints,
+            'batches': {'count': len(self.batches), 'mean_size': round(float(batches.mean()), 2),
+                        'max_size': int(batches.max())},
+        }
+
+class MicroBatcher:
+    """
+    Request Coalescer.
+    Handler threads enqueue their records and wait on a Future; one worker
+    thread drains the queue, waiting at most max_wait after the first item for
+    more to arrive (up to max_batch rows), and scores them in a single call.
+    """
+
+    def __init__(self, model, max_batch=64, max_wait=0.005, stats=None):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats
+        self.queue = queue.Queue()
+        self.worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self.worker.start()
+
+    def submit(self, records):
+        future = Future()
+        self.queue.put((records, future))
+        return future
+
+    def close(self):
+        self.queue.put(None)
+        self.worker.join()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            pending, size = [item], len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Finish this batch, then stop
+                    self.queue.put(None)
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._score(pending)
+
+    def _score(self, pending):
+        records = [r for recs, _ in pending for r in recs]
+        try:
+            results = predict_records(self.model, records)
+        except Exception as e:
+            # One bad request must not fail the others in its batch
+            if len(pending) > 1:
+                for item in pending:
+                    self._score([item])
+            else:
+                pending[0][1].set_exception(e)
+            return
+        if self.stats:
+            self.stats.record_batch(len(records))
+        start = 0
+        for recs, future in pending:
+            future.set_result(results[start:start + len(recs)])
+            start += len(recs)
+
+def _frame(records, required):
+    missing = sorted({col for r in records for col in required if r.get(col) is None})
+    if missing:
+        raise RequestError(f"missing fields: {missing}")
+    return pd.DataFrame.from_records(records)
+
+def _fill_fatigue(df):
+    # Fatigue_Score is optional on input; compute it the way the app does when absent
+    if 'Fatigue_Score' not in df.columns:
+        df['Fatigue_Score'] = np.nan
+    missing = df['Fatigue_Score'].isna().to_numpy()
+    if missing.any():
+        df.loc[missing, 'Fatigue_Score'] = Optimizer.calculate_fatigue_batch(df[missing])
+    return df
+
+def predict_records(model, records):
+    """Scores a list of employee dicts in one predict_proba call."""
+    required = [f for f in model.feature_names if f != 'Fatigue_Score']
+    df = _frame(records, required)
+    if 'Employee_ID' not in df.columns:
+        df['Employee_ID'] = None
+    try:
+        # Non-numeric inputs surface here, in the fatigue fill or the encoder
+        df = _fill_fatigue(df)
+        results = model.predict_attrition(df)
+    except (TypeError, ValueError) as e:
+        raise RequestError(str(e)) from e
+    return [{
+        'Employee_ID': emp,
+        'Probability': round(float(p), 4),
+        'Attrition_Risk': risk,
+        'Fatigue_Score': float(f),
+    } for emp, p, risk, f in zip([r.get('Employee_ID') for r in records], results['Probability'],
+                                 results['Attrition_Risk'], df['Fatigue_Score'])]
+
+def fatigue_records(records):
+    df = _frame(records, FATIGUE_INPUTS)
+    try:
+        scores = Optimizer.calculate_fatigue_batch(df)
+    except (TypeError, ValueError) as e:
+        raise RequestError(str(e)) from e
+    return [{'Employee_ID': r.get('Employee_ID'), 'Fatigue_Score': float(s)} for r, s in zip(records, scores)]
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    server_version = "ShiftSyncScoring/1.0"
+
+    def do_GET(self):
+        if self.path == '/health':
+            metrics = self.server.model_metrics
+            self._send(200, {'status': 'ok', 'artifacts': metrics})
+        elif self.path == '/metrics':
+            self._send(200, self.server.stats.snapshot())
+        else:
+            self._send(404, {'error': f"unknown path {self.path}"})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        endpoint = self.path
+        if endpoint not in ('/predict', '/fatigue'):
+            self._send(404, {'error': f"unknown path {self.path}"})
+            return
+        status = 200
+        try:
+            records, single = self._records()
+            if endpoint == '/predict':
+                results = self.server.batcher.submit(records).result(timeout=self.server.timeout_seconds)
+            else:
+                results = fatigue_records(records)
+            body = results[0] if single else {'results': results}
+        except RequestError as e:
+            status, body = 400, {'error': str(e)}
+        except Exception as e:
+            status, body = 500, {'error': f"{type(e).__name__}: {e}"}
+        self._send(status, body)
+        self.server.stats.record(endpoint, time.perf_counter() - start, ok=status == 200)
+
+    def _records(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'null')
+        except json.JSONDecodeError as e:
+            raise RequestError(f"invalid JSON: {e}") from e
+        if isinstance(payload, dict) and 'employees' in payload:
+            payload = payload['employees']
+        if isinstance(payload, dict):
+            return [payload], True
+        if isinstance(payload, list) and payload and all(isinstance(r, dict) for r in payload):
+            return payload, False
+        raise RequestError("expected an employee object, a non-empty list, or {\"employees\": [...]}")
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, model_dir="src", max_batch=64, max_wait_ms=5, timeout_seconds=30, verbose=False):
+        self.model = Model(model_dir)
+        # Warm every artifact and the compiled tables before accepting traffic
+        self.model_metrics = self.model.ensure_loaded().to_dict('records')
+        self.model.compile()
+        self.stats = LatencyStats()
+        self.batcher = MicroBatcher(self.model, max_batch, max_wait_ms / 1000, self.stats)
+        self.timeout_seconds = timeout_seconds
+        self.verbose = verbose
+        super().__init__(address, ScoringHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.batcher.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local attrition/fatigue scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--model-dir', default='src')
+    parser.add_argument('--max-batch', type=int, default=64, help="Rows per predict_proba call")
+    parser.add_argument('--max-wait-ms', type=float, default=5, help="How long a batch waits to fill")
+    parser.add_argument('--verbose', action='store_true', help="Log every request")
+    args = parser.parse_args(argv)
+
+    server = ScoringServer((args.host, args.port), args.model_dir, args.max_batch, args.max_wait_ms,
+                           verbose=args.verbose)
+    print(f"Scoring service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
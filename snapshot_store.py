@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import date
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # listed in requirements.txt; without it Database falls back to SQLite reads
+    pa = None
+    ds = None
+
+class SnapshotStore:
+    """
+    Columnar Employee Snapshots (Parquet via pyarrow.dataset).
+    Each snapshot is written as a hive-partitioned dataset:
+
+        <root>/Department=<dept>/snapshot_date=<YYYY-MM-DD>/part-*.parquet
+
+    Reads only open the partitions and column chunks they need: Department and
+    date filters prune directories, other filters are pushed down to Parquet
+    row-group statistics, and only the requested columns are decoded.
+    """
+    META_FILE = '_snapshots.json'
+
+    def __init__(self, root, schema):
+        self.root = root
+        # schema: {column: 'text' | 'integer' | 'real'}, the employee columns to persist.
+        # Numbers are stored as float64 so anything SQLite holds round-trips;
+        # read() restores int64 where SQLite would return integers.
+        self.schema = pa.schema([(c, pa.string() if t == 'text' else pa.float64()) for c, t in schema.items()])
+        self.integer_columns = [c for c, t in schema.items() if t == 'integer']
+        self.partitioning = ds.partitioning(
+            pa.schema([('Department', pa.string()), ('snapshot_date', pa.string())]), flavor='hive')
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def available():
+        return pa is not None
+
+    def _meta(self):
+        path = os.path.join(self.root, self.META_FILE)
+        if not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    def snapshot_dates(self):
+        return sorted(self._meta().get('dates', {}))
+
+    def version(self, snapshot_date=None):
+        """Source table version the snapshot was taken at (None if there is none)."""
+        dates = self._meta().get('dates', {})
+        snapshot_date = snapshot_date or (max(dates) if dates else None)
+        return dates.get(snapshot_date)
+
+    def write(self, frames, snapshot_date=None, version=None):
+        """
+        Streams an iterable of DataFrame chunks into one snapshot, replacing
+        any earlier snapshot with the same date.
+        """
+        snapshot_date = str(snapshot_date or date.today())
+        for dept_dir in os.listdir(self.root):
+            stale = os.path.join(self.root, dept_dir, f'snapshot_date={snapshot_date}')
+            if os.path.isdir(stale):
+                shutil.rmtree(stale)
+
+        fields = [f for f in self.schema if f.name != 'snapshot_date']
+        schema = pa.schema(fields + [pa.field('snapshot_date', pa.string())])
+
+        rows = 0
+        def batches():
+            nonlocal rows
+            for frame in frames:
+                frame = frame.reindex(columns=[f.name for f in fields])
+                frame['snapshot_date'] = snapshot_date
+                rows += len(frame)
+                yield from pa.Table.from_pandas(frame, schema=schema, preserve_index=False).to_batches()
+
+        ds.write_dataset(batches(), self.root, schema=schema, format='parquet',
+                         partitioning=self.partitioning, existing_data_behavior='overwrite_or_ignore',
+                         basename_template=f'part-{uuid.uuid4().hex[:8]}-{{i}}.parquet')
+
+        meta = self._meta()
+        meta.setdefault('dates', {})[snapshot_date] = version
+        # Write-then-rename, so a crash never leaves a truncated index behind
+        fd, tmp = tempfile.mkstemp(dir=self.root, prefix='_snapshots-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(self.root, self.META_FILE))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return rows
+
+    def read(self, columns=None, filters=None, snapshot_date=None):
+        """
+        columns: list to project (None = all); filters: {column: value or list};
+        snapshot_date defaults to the latest snapshot.
+        """
+        dates = self.snapshot_dates()
+        snapshot_date = str(snapshot_date or (dates[-1] if dates else date.today()))
+        # The metadata file is skipped by pyarrow's default '_' ignore prefix
+        dataset = ds.dataset(self.root, format='parquet', partitioning=self.partitioning)
+
+        expr = ds.field('snapshot_date') == snapshot_date
+        for col, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                expr = expr & ds.field(col).isin(list(value))
+            else:
+                expr = expr & (ds.field(col) == value)
+
+        names = [f.name for f in self.schema if f.name != 'snapshot_date']
+        table = dataset.to_table(columns=list(columns) if columns else names, filter=expr)
+        # Hand Arrow buffers to pandas without an intermediate consolidated copy
+        df = table.to_pandas(split_blocks=True, self_destruct=True)
+        # Match SQLite reads: INTEGER columns come back as int64 unless they hold NULLs or fractions
+        for col in self.integer_columns:
+            if col in df.columns:
+                values = df[col]
+                if values.notna().all() and (values % 1 == 0).all():
+                    df[col] = values.astype('int64')
+        return df
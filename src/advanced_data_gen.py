@@ -1,41 +1,32 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-def generate_advanced_data(n=1200):
-    np.random.seed(123)
-    
-    data = {
-        'Employee_ID': [f'EMP_{i:04d}' for i in range(1, n+1)],
-        'Age': np.random.randint(19, 58, n),
-        'Gender': np.random.choice(['Male', 'Female'], n, p=[0.75, 0.25]),
-        'Department': np.random.choice(['Production', 'Logistics', 'Quality', 'Maintenance'], n),
-        'Shift_Type': np.random.choice(['Morning', 'Evening', 'Night'], n),
-        'Daily_Wages': np.random.randint(450, 1500, n),
-        'Overtime_Hours': np.random.randint(0, 25, n),
-        'Distance_km': np.random.randint(1, 45, n),
-        'Years_of_Service': np.random.randint(0, 20, n),
-        'Last_Month_Leave': np.random.randint(0, 8, n),
-        'Satisfaction': np.random.randint(1, 6, n),
-    }
-    
-    df = pd.DataFrame(data)
-    
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'advanced_hr_data.csv')
+FORMATS = ('csv', 'parquet', 'sqlite')
+
+def derive_features(df, rng):
+    """Fatigue score, trends and attrition target, drawn from rng after the base columns."""
     # Derived Feature: Fatigue Score (1-100)
     # Weight: 0.4*OT + 0.2*NightShift + 0.1*Commute + 0.1*(60-Age) + 0.2*Leaves
     night_weight = (df['Shift_Type'] == 'Night').astype(int) * 20
     df['Fatigue_Score'] = (
-        (df['Overtime_Hours'] / 25 * 40) + 
-        night_weight + 
-        (df['Distance_km'] / 45 * 10) + 
-        ((60 - df['Age']) / 40 * 10) + 
+        (df['Overtime_Hours'] / 25 * 40) +
+        night_weight +
+        (df['Distance_km'] / 45 * 10) +
+        ((60 - df['Age']) / 40 * 10) +
         (df['Last_Month_Leave'] / 8 * 20)
     ).clip(1, 100).round(2)
-    
+
     # New Actionable Features
-    df['OT_Trend'] = np.random.choice(['Rising', 'Stable', 'Falling'], n, p=[0.3, 0.5, 0.2])
-    df['Leave_Trend'] = np.random.choice(['Rising', 'Stable', 'Falling'], n, p=[0.2, 0.6, 0.2])
-    
+    n = len(df)
+    df['OT_Trend'] = rng.choice(['Rising', 'Stable', 'Falling'], n, p=[0.3, 0.5, 0.2])
+    df['Leave_Trend'] = rng.choice(['Rising', 'Stable', 'Falling'], n, p=[0.2, 0.6, 0.2])
+
     # Target Logic: Attrition (highly imbalanced ~15%)
     # Risk Factor Calculation
     risk = (
@@ -45,13 +36,120 @@ def generate_advanced_data(n=1200):
         (df['Daily_Wages'] < 600).astype(int) * 2 +
         (df['Years_of_Service'] < 2).astype(int) * 1
     )
-    
+
     # 0.15 probability of churn if risk > 5
-    df['Attrition'] = (risk > 6).map({True: 'Yes', False: 'No'})
-    
-    output_path = r"c:\Users\ashok\OneDrive\Desktop\AI-Driven Blue-Collar Attrition Prediction and Shift Optimization\data\advanced_hr_data.csv"
-    df.to_csv(output_path, index=False)
+    df['Attrition'] = np.where(risk > 6, 'Yes', 'No')
+    return df
+
+def generate_chunk(seed, index, start, n):
+    """
+    Rows start+1 .. start+n. Chunk 0 draws from RandomState(seed) in the
+    original column order, so any dataset that fits in one chunk is identical
+    to the legacy np.random.seed(seed) output; later chunks get independent
+    streams derived from (seed, index). A chunk therefore depends only on its
+    position, never on how many processes produced the file.
+    """
+    rng = np.random.RandomState(seed if index == 0 else np.random.SeedSequence([seed, index]).generate_state(1)[0])
+    ids = np.arange(start + 1, start + n + 1).astype(str)
+    data = {
+        'Employee_ID': np.char.add('EMP_', np.char.zfill(ids, 4)),
+        'Age': rng.randint(19, 58, n),
+        'Gender': rng.choice(['Male', 'Female'], n, p=[0.75, 0.25]),
+        'Department': rng.choice(['Production', 'Logistics', 'Quality', 'Maintenance'], n),
+        'Shift_Type': rng.choice(['Morning', 'Evening', 'Night'], n),
+        'Daily_Wages': rng.randint(450, 1500, n),
+        'Overtime_Hours': rng.randint(0, 25, n),
+        'Distance_km': rng.randint(1, 45, n),
+        'Years_of_Service': rng.randint(0, 20, n),
+        'Last_Month_Leave': rng.randint(0, 8, n),
+        'Satisfaction': rng.randint(1, 6, n),
+    }
+    return derive_features(pd.DataFrame(data), rng)
+
+def iter_chunks(n, seed=123, chunk_size=100000, workers=1):
+    """Yields chunks in order; with workers > 1 they are built in a process pool, at most 2 per worker in flight."""
+    spans = [(i, start, min(chunk_size, n - start)) for i, start in enumerate(range(0, n, chunk_size))]
+    if workers <= 1 or len(spans) == 1:
+        for index, start, size in spans:
+            yield generate_chunk(seed, index, start, size)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for index, start, size in spans:
+            pending.append(pool.submit(generate_chunk, seed, index, start, size))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+class ChunkWriter:
+    """Appends chunks to CSV, Parquet (pyarrow) or the app's SQLite employees table."""
+
+    def __init__(self, output_path, fmt):
+        self.output_path = output_path
+        self.fmt = fmt
+        self.parquet = None
+        self.db = None
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        if fmt == 'sqlite':
+            sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+            from database import Database
+            self.db = Database(os.path.abspath(output_path))
+        elif os.path.exists(output_path):
+            os.remove(output_path)
+
+    def write(self, chunk, first):
+        if self.fmt == 'csv':
+            chunk.to_csv(self.output_path, mode='w' if first else 'a', header=first, index=False)
+        elif self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if self.parquet is None:
+                self.parquet = pq.ParquetWriter(self.output_path, table.schema)
+            self.parquet.write_table(table)
+        else:
+            self.db.save_employees(chunk, mode="upsert")
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+
+def generate_advanced_data(n=1200, seed=123, output_path=DEFAULT_OUTPUT, fmt=None,
+                           chunk_size=100000, workers=1):
+    """
+    Writes n synthetic employees chunk by chunk, so memory is bounded by
+    chunk_size rather than n, and returns the output path. With
+    output_path=None the chunks are concatenated and returned as a DataFrame.
+    """
+    if output_path is None:
+        return pd.concat(iter_chunks(n, seed, chunk_size, workers), ignore_index=True)
+
+    fmt = fmt or infer_format(output_path)
+    writer = ChunkWriter(output_path, fmt)
+    try:
+        for i, chunk in enumerate(iter_chunks(n, seed, chunk_size, workers)):
+            writer.write(chunk, first=(i == 0))
+    finally:
+        writer.close()
     print(f"Advanced dataset generated: {output_path}")
+    return output_path
+
+def infer_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    return {'db': 'sqlite', 'sqlite3': 'sqlite', 'pq': 'parquet'}.get(ext, ext if ext in FORMATS else 'csv')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Synthetic blue-collar workforce generator")
+    parser.add_argument('--rows', type=int, default=1200)
+    parser.add_argument('--seed', type=int, default=123)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--format', choices=FORMATS, help="Defaults to the output file extension")
+    parser.add_argument('--chunk-size', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=1, help="Processes generating chunks in parallel")
+    args = parser.parse_args(argv)
+    generate_advanced_data(args.rows, args.seed, args.output, args.format, args.chunk_size, args.workers)
 
 if __name__ == "__main__":
-    generate_advanced_data()
+    main()
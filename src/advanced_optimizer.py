@@ -1,48 +1,37 @@
+import joblib
 import pandas as pd
 import numpy as np
+from optimizer import Optimizer
 
 def advanced_optimize_shifts(df, risk_probs):
     """
     Optimizes based on Fatigue Score and Attrition Probability.
     """
-    optimized = df.copy()
-    optimized['Risk_Probability'] = risk_probs
-    
-    recommendations = []
-    
-    for i, row in optimized.iterrows():
-        action = "Keep Current"
-        new_shift = row['Shift_Type']
-        new_ot = row['Overtime_Hours']
-        
+    fatigue = df['Fatigue_Score'].to_numpy()
+    risk = np.asarray(risk_probs, dtype=float)
+
+    rules = [
         # Rule 1: High Fatigue (>75) OR High Risk (>0.4)
-        if row['Fatigue_Score'] > 75 or row['Risk_Probability'] > 0.4:
-            if row['Shift_Type'] == 'Night':
-                new_shift = 'Morning'
-                action = "Rotate to Morning"
-            
-            if row['Overtime_Hours'] > 8:
-                new_ot = 8
-                action += " | Cap OT at 8h"
-                
+        {'when': (fatigue > 75) | (risk > 0.4), 'rotate': "Rotate to Morning",
+         'ot_cap': 8, 'cap': " | Cap OT at 8h", 'append': True},
         # Rule 2: Moderate Fatigue (>60)
-        elif row['Fatigue_Score'] > 60:
-            if row['Overtime_Hours'] > 12:
-                new_ot = 12
-                action = "Cap OT at 12h"
+        {'when': fatigue > 60, 'ot_cap': 12, 'cap': "Cap OT at 12h"},
+    ]
+    new_shift, new_ot, action = Optimizer.apply_rules(
+        df['Shift_Type'].to_numpy(), df['Overtime_Hours'].to_numpy(),
+        rules, "Keep Current"
+    )
 
-        recommendations.append({
-            'Employee_ID': row['Employee_ID'],
-            'Department': row['Department'],
-            'Fatigue': row['Fatigue_Score'],
-            'Current_Shift': row['Shift_Type'],
-            'Suggested_Shift': new_shift,
-            'Original_OT': row['Overtime_Hours'],
-            'Suggested_OT': new_ot,
-            'Action': action
-        })
-        
-    return pd.DataFrame(recommendations)
+    return pd.DataFrame({
+        'Employee_ID': df['Employee_ID'].to_numpy(),
+        'Department': df['Department'].to_numpy(),
+        'Fatigue': fatigue,
+        'Current_Shift': df['Shift_Type'].to_numpy(),
+        'Suggested_Shift': new_shift,
+        'Original_OT': df['Overtime_Hours'].to_numpy(),
+        'Suggested_OT': new_ot,
+        'Action': action
+    })
 
 def run_what_if_analysis(df, model, scaler, encoders, wage_mod=0, ot_mod=0):
     """
@@ -65,3 +54,59 @@ def run_what_if_analysis(df, model, scaler, encoders, wage_mod=0, ot_mod=0):
     probs = model.predict_proba(X_scaled)[:, 1]
     
     return probs.mean(), (probs > 0.5).sum()
+
+def run_policy_grid(model, df, wage_mods, ot_mods, refresh_fatigue=True, batch_rows=1000000, n_jobs=-1):
+    """
+    Vectorized What-If Grid.
+    Encodes and scales the workforce once, then for every (wage_mod, ot_mod)
+    scenario rewrites only the affected columns (Daily_Wages, Overtime_Hours
+    and, if refresh_fatigue, the Fatigue_Score derived from OT). Scenarios are
+    stacked into batches of up to batch_rows rows per predict_proba call.
+    Returns one row per scenario; pivot on the two adjustment columns for a heatmap.
+    High_Risk_Count uses the model's High tier cut-off, as the risk pages do.
+    """
+    compiled = model.compile()
+    features = compiled['features']
+    base = model.feature_matrix(df)
+    n = len(df)
+
+    # Same (x - mean) / scale as Model.scale, so each scenario matches a full re-encode
+    def scaled_column(name, values):
+        j = features.index(name)
+        return ((values - compiled['mean'][j]) / compiled['scale'][j]).astype(np.float32)
+
+    wages = df['Daily_Wages'].to_numpy(dtype=float)
+    overtime = df['Overtime_Hours'].to_numpy(dtype=float)
+    fatigue_inputs = (df['Shift_Type'].to_numpy(), df['Distance_km'].to_numpy(),
+                      df['Age'].to_numpy(), df['Last_Month_Leave'].to_numpy())
+    # Scenarios move the stored score by the OT-driven change only, so the
+    # (0, 0) scenario reproduces the baseline whatever produced Fatigue_Score
+    base_fatigue = df['Fatigue_Score'].to_numpy(dtype=float)
+    base_engine = Optimizer.fatigue_scores(overtime, *fatigue_inputs)
+    scenarios = [(w, o) for w in wage_mods for o in ot_mods]
+
+    per_batch = max(1, batch_rows // max(n, 1))
+    results = []
+    for start in range(0, len(scenarios), per_batch):
+        block = scenarios[start:start + per_batch]
+        stacked = np.tile(base, (len(block), 1))
+        for k, (wage_mod, ot_mod) in enumerate(block):
+            rows = slice(k * n, (k + 1) * n)
+            sim_ot = np.clip(overtime + ot_mod, 0, 40)
+            stacked[rows, features.index('Daily_Wages')] = scaled_column('Daily_Wages', np.clip(wages + wage_mod, 450, None))
+            stacked[rows, features.index('Overtime_Hours')] = scaled_column('Overtime_Hours', sim_ot)
+            if refresh_fatigue:
+                fatigue = base_fatigue + (Optimizer.fatigue_scores(sim_ot, *fatigue_inputs) - base_engine)
+                stacked[rows, features.index('Fatigue_Score')] = scaled_column('Fatigue_Score', fatigue)
+
+        with joblib.parallel_config(n_jobs=n_jobs):
+            probs = model.clf.predict_proba(stacked)[:, 1].reshape(len(block), n)
+        for (wage_mod, ot_mod), p in zip(block, probs):
+            results.append({
+                'Wage_Adjustment': wage_mod,
+                'OT_Adjustment': ot_mod,
+                'Avg_Risk': p.mean(),
+                'High_Risk_Count': int((p > model.HIGH_RISK).sum()),
+            })
+
+    return pd.DataFrame(results)
@@ -1,83 +1,195 @@
 import pandas as pd
 import numpy as np
 import os
+import sys
+import argparse
+import tempfile
 import joblib
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import classification_report, f1_score, precision_score, recall_score, roc_auc_score
 try:
     from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline
 except ImportError:
     SMOTE = None
+    from sklearn.pipeline import Pipeline
+try:
+    from xgboost import XGBClassifier
+except ImportError:
+    XGBClassifier = None
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATA_PATH = os.path.join(ROOT, 'data', 'advanced_hr_data.csv')
+MODEL_DIR = os.path.join(ROOT, 'src')
+CACHE_DIR = os.path.join(tempfile.gettempdir(), 'shiftsync_train_cache')
+
+CAT_COLS = ['Gender', 'Department', 'Shift_Type', 'OT_Trend', 'Leave_Trend']
+SCORING = {'f1': 'f1', 'roc_auc': 'roc_auc', 'precision': 'precision', 'recall': 'recall'}
+
+def search_spaces(y, random_state=42):
+    """
+    Candidate estimators and their grids (keys address the 'clf' pipeline step).
+    Without SMOTE, imbalance is handled by class weights instead.
+    """
+    weight = None if SMOTE else 'balanced'
+    spaces = {
+        'rf': (RandomForestClassifier(class_weight=weight, random_state=random_state, n_jobs=1), {
+            'clf__n_estimators': [100, 300],
+            'clf__max_depth': [None, 12],
+            'clf__min_samples_leaf': [1, 5],
+        }),
+        'lr': (LogisticRegression(class_weight=weight, max_iter=2000), {
+            'clf__C': [0.01, 0.1, 1.0, 10.0],
+        }),
+    }
+    if XGBClassifier is not None:
+        pos_weight = 1.0 if SMOTE else float((y == 0).sum() / max((y == 1).sum(), 1))
+        spaces['xgb'] = (XGBClassifier(scale_pos_weight=pos_weight, eval_metric='logloss',
+                                       random_state=random_state, n_jobs=1), {
+            'clf__n_estimators': [200, 400],
+            'clf__max_depth': [3, 6],
+            'clf__learning_rate': [0.05, 0.1],
+        })
+    return spaces
+
+def build_pipeline(clf, memory=None, random_state=42):
+    # Scaling and SMOTE are fitted inside each CV fold, never on validation rows;
+    # `memory` caches those fitted steps so every candidate reuses them per fold
+    steps = [('scaler', StandardScaler())]
+    if SMOTE:
+        steps.append(('smote', SMOTE(random_state=random_state)))
+    steps.append(('clf', clf))
+    return Pipeline(steps, memory=memory)
 
-def train_advanced_model():
-    data_path = r"c:\Users\ashok\OneDrive\Desktop\AI-Driven Blue-Collar Attrition Prediction and Shift Optimization\data\advanced_hr_data.csv"
+def dump_artifact(value, path):
+    # Write-then-rename: processes that memory-mapped the old file keep their
+    # copy intact, and ModelRegistry sees a new file and reloads it
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.' + os.path.basename(path) + '-',
+                               suffix='.tmp')
+    os.close(fd)
+    try:
+        joblib.dump(value, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def feature_importance(clf, columns):
+    if hasattr(clf, 'feature_importances_'):
+        weights = clf.feature_importances_
+    else:
+        # Linear models: magnitude of the coefficients on standardized inputs
+        weights = np.abs(clf.coef_[0])
+        weights = weights / weights.sum()
+    return pd.DataFrame({'Feature': columns, 'Importance': weights}).sort_values('Importance', ascending=False)
+
+def train_advanced_model(data_path=DATA_PATH, model_dir=MODEL_DIR, models=None, cv=5, n_jobs=-1,
+                         cache_dir=CACHE_DIR, random_state=42):
+    """
+    Parallel Model Search.
+    Grid-searches every candidate family with stratified K-fold CV across all
+    cores, picks the best by mean CV F1, reports it on a held-out test split
+    and saves the adv_* artifacts that Model loads.
+    """
     if not os.path.exists(data_path):
         print("Data not found. Running generation script first...")
-        from src.advanced_data_gen import generate_advanced_data
-        generate_advanced_data()
-        
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from advanced_data_gen import generate_advanced_data
+        generate_advanced_data(output_path=data_path)
+
     df = pd.read_csv(data_path)
-    
+
     # Encoders
     encoders = {}
-    cat_cols = ['Gender', 'Department', 'Shift_Type', 'OT_Trend', 'Leave_Trend']
-    
-    for col in cat_cols:
+    for col in CAT_COLS:
         le = LabelEncoder()
         df[col] = le.fit_transform(df[col].astype(str))
         encoders[col] = le
-    
+
     df['Attrition'] = df['Attrition'].map({'Yes': 1, 'No': 0})
-    
+
     X = df.drop(['Employee_ID', 'Attrition'], axis=1)
     y = df['Attrition']
-    
+
     # Split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
-    
-    # Scale
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-    
-    # Handle Class Imbalance with SMOTE
-    if SMOTE:
-        smote = SMOTE(random_state=42)
-        X_train_res, y_train_res = smote.fit_resample(X_train_scaled, y_train)
-        print("SMOTE applied to handle class imbalance.")
-    else:
-        X_train_res, y_train_res = X_train_scaled, y_train
-        print("SMOTE not available. Using weighted training.")
-    
-    # Model: Balanced Random Forest
-    model = RandomForestClassifier(n_estimators=100, class_weight='balanced', random_state=42)
-    model.fit(X_train_res, y_train_res)
-    
-    # Eval
-    y_pred = model.predict(X_test_scaled)
-    print("\nAdvanced Model Classification Report (Random Forest):")
-    print(classification_report(y_test, y_pred))
-    
-    # Feature Importance (XAI)
-    importances = pd.DataFrame({
-        'Feature': X.columns,
-        'Importance': model.feature_importances_
-    }).sort_values('Importance', ascending=False)
-    
-    # Save Artifacts
-    model_dir = r"c:\Users\ashok\OneDrive\Desktop\AI-Driven Blue-Collar Attrition Prediction and Shift Optimization\src"
-    if not os.path.exists(model_dir):
-        os.makedirs(model_dir)
-        
-    joblib.dump(model, os.path.join(model_dir, 'adv_model.pkl'))
-    joblib.dump(scaler, os.path.join(model_dir, 'adv_scaler.pkl'))
-    joblib.dump(encoders, os.path.join(model_dir, 'adv_encoders.pkl'))
-    joblib.dump(importances, os.path.join(model_dir, 'adv_importance.pkl'))
-    joblib.dump(list(X.columns), os.path.join(model_dir, 'adv_features.pkl'))
-    
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=random_state, stratify=y)
+
+    spaces = search_spaces(y_train, random_state)
+    unknown = set(models or []) - set(spaces)
+    if unknown:
+        raise ValueError(f"Unavailable model families: {sorted(unknown)} (available: {sorted(spaces)})")
+    print("SMOTE applied inside CV folds." if SMOTE else "SMOTE not available. Using weighted training.")
+
+    memory = joblib.Memory(cache_dir, verbose=0) if cache_dir else None
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    results = []
+    best = None
+    for name in models or spaces:
+        clf, grid = spaces[name]
+        search = GridSearchCV(build_pipeline(clf, memory, random_state), grid, scoring=SCORING, refit='f1',
+                              cv=folds, n_jobs=n_jobs, error_score='raise')
+        search.fit(X_train, y_train)
+
+        # Held-out evaluation of the refitted best candidate
+        probs = search.predict_proba(X_test)[:, 1]
+        y_pred = (probs >= 0.5).astype(int)
+        results.append({
+            'Model': name,
+            'CV_F1': search.best_score_,
+            'CV_ROC_AUC': search.cv_results_['mean_test_roc_auc'][search.best_index_],
+            'Test_F1': f1_score(y_test, y_pred),
+            'Test_Precision': precision_score(y_test, y_pred, zero_division=0),
+            'Test_Recall': recall_score(y_test, y_pred),
+            'Test_ROC_AUC': roc_auc_score(y_test, probs),
+            'Fit_Seconds': search.refit_time_ + search.cv_results_['mean_fit_time'].sum() * cv,
+            'Best_Params': search.best_params_,
+        })
+        print(f"{name}: CV F1 {search.best_score_:.3f} with {search.best_params_}")
+        if best is None or search.best_score_ > best[1].best_score_:
+            best = (name, search)
+    if memory is not None:
+        memory.reduce_size(bytes_limit='1G')
+
+    results_df = pd.DataFrame(results).sort_values('CV_F1', ascending=False)
+    print("\nModel Comparison (best candidate per family):")
+    print(results_df.drop(columns='Best_Params').to_string(index=False, float_format='%.3f'))
+
+    name, search = best
+    scaler = search.best_estimator_.named_steps['scaler']
+    model = search.best_estimator_.named_steps['clf']
+    # The search pins n_jobs=1 per fit (the folds are the parallel unit); the
+    # saved model goes back to the estimator's default threading for inference
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=None)
+    print(f"\nSelected {name}. Held-out Classification Report:")
+    print(classification_report(y_test, search.predict(X_test)))
+
+    # Save Artifacts (the separate scaler/clf layout Model.compile expects)
+    os.makedirs(model_dir, exist_ok=True)
+    dump_artifact(model, os.path.join(model_dir, 'adv_model.pkl'))
+    dump_artifact(scaler, os.path.join(model_dir, 'adv_scaler.pkl'))
+    dump_artifact(encoders, os.path.join(model_dir, 'adv_encoders.pkl'))
+    dump_artifact(feature_importance(model, X.columns), os.path.join(model_dir, 'adv_importance.pkl'))
+    dump_artifact(list(X.columns), os.path.join(model_dir, 'adv_features.pkl'))
+
     print(f"Advanced model artifacts saved in {model_dir}")
+    return results_df
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validated model search for attrition prediction")
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--models', nargs='+', help="Families to search: rf lr xgb (default: all available)")
+    parser.add_argument('--cv', type=int, default=5)
+    parser.add_argument('--jobs', type=int, default=-1, help="Parallel fits (-1: all cores)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--no-cache', action='store_true', help="Refit preprocessing for every candidate")
+    args = parser.parse_args()
+    train_advanced_model(args.data, args.model_dir, args.models, args.cv, args.jobs,
+                         None if args.no_cache else args.cache_dir)
 
 if __name__ == "__main__":
-    train_advanced_model()
+    main()
@@ -2,10 +2,11 @@ import pandas as pd
 import numpy as np
 import os
 
-# Set seed for reproducibility
-np.random.seed(42)
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'hr_attrition_data.csv')
 
-def generate_data(num_records=1000):
+def generate_data(num_records=1000, seed=42, output_path=DEFAULT_OUTPUT):
+    # Set seed for reproducibility
+    np.random.seed(seed)
     data = {
         'Employee_ID': range(1001, 1001 + num_records),
         'Age': np.random.randint(18, 60, size=num_records),
@@ -36,13 +37,11 @@ def generate_data(num_records=1000):
     df['Attrition'] = (risk_score > 8).map({True: 'Yes', False: 'No'})
 
     # Save to CSV
-    output_dir = r"c:\Users\ashok\OneDrive\Desktop\AI-Driven Blue-Collar Attrition Prediction and Shift Optimization\data"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-    
-    file_path = os.path.join(output_dir, "hr_attrition_data.csv")
-    df.to_csv(file_path, index=False)
-    print(f"Dataset generated with {num_records} records at {file_path}")
+    if output_path:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        df.to_csv(output_path, index=False)
+        print(f"Dataset generated with {num_records} records at {output_path}")
+    return df
 
 if __name__ == "__main__":
     generate_data()
@@ -9,10 +9,17 @@ from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix
 import joblib
+from joblib import Parallel, delayed
 
-def train_models():
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DATA_PATH = os.path.join(ROOT, 'data', 'hr_attrition_data.csv')
+MODEL_DIR = os.path.join(ROOT, 'src')
+
+def _fit(model, X, y):
+    return model.fit(X, y)
+
+def train_models(data_path=DATA_PATH, model_dir=MODEL_DIR, n_jobs=-1):
     # Load dataset
-    data_path = r"c:\Users\ashok\OneDrive\Desktop\AI-Driven Blue-Collar Attrition Prediction and Shift Optimization\data\hr_attrition_data.csv"
     df = pd.read_csv(data_path)
 
     # Preprocessing
@@ -43,8 +50,9 @@ def train_models():
     best_model = None
     best_f1 = 0
 
-    for name, model in models.items():
-        model.fit(X_train_scaled, y_train)
+    # Fit the candidates concurrently, one per core
+    fitted = Parallel(n_jobs=n_jobs)(delayed(_fit)(model, X_train_scaled, y_train) for model in models.values())
+    for name, model in zip(models, fitted):
         y_pred = model.predict(X_test_scaled)
         
         acc = accuracy_score(y_test, y_pred)
@@ -70,7 +78,7 @@ def train_models():
     print(results_df)
 
     # Save best model and artifacts
-    model_dir = r"c:\Users\ashok\OneDrive\Desktop\AI-Driven Blue-Collar Attrition Prediction and Shift Optimization\src"
+    os.makedirs(model_dir, exist_ok=True)
     joblib.dump(best_model, os.path.join(model_dir, 'attrition_model.pkl'))
     joblib.dump(scaler, os.path.join(model_dir, 'scaler.pkl'))
     joblib.dump(le_gender, os.path.join(model_dir, 'le_gender.pkl'))
@@ -0,0 +1,49 @@
+import os
+import shutil
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from model import Model, ModelRegistry
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from advanced_train import dump_artifact  # noqa: E402
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    for filename in Model.ARTIFACTS.values():
+        shutil.copy(os.path.join(ROOT, 'src', filename), tmp_path / filename)
+    yield tmp_path
+    ModelRegistry.clear()
+
+
+def test_retrain_swaps_artifacts_without_corrupting_loaded_ones(model_dir):
+    ai = Model(str(model_dir))
+    old = ai.scaler
+    old_mean = np.array(old.mean_)
+    assert not np.allclose(old_mean, 0)
+    ai.compile()
+
+    n = len(old_mean)
+    retrained = StandardScaler().fit(np.vstack([np.full(n, 5.0), np.full(n, 7.0)]))
+    dump_artifact(retrained, str(model_dir / 'adv_scaler.pkl'))
+
+    # Arrays mapped from the old file are untouched ...
+    np.testing.assert_array_equal(old.mean_, old_mean)
+    # ... and the registry reloads the new file, compiled tables included
+    np.testing.assert_array_equal(Model(str(model_dir)).scaler.mean_, np.full(n, 6.0))
+    np.testing.assert_array_equal(ai.compile()['mean'], np.full(n, 6.0))
+    assert not [f for f in os.listdir(model_dir) if f.endswith('.tmp')]
+
+
+def test_registry_retries_once_the_file_appears(model_dir):
+    scaler = joblib.load(model_dir / 'adv_scaler.pkl')
+    os.remove(model_dir / 'adv_scaler.pkl')
+    assert Model(str(model_dir)).scaler is None
+    dump_artifact(scaler, str(model_dir / 'adv_scaler.pkl'))
+    assert Model(str(model_dir)).scaler is not None
@@ -0,0 +1,40 @@
+import importlib
+import json
+import os
+import sys
+
+import pandas as pd
+
+import cli
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def test_imports_without_resource_module(monkeypatch, capsys):
+    # Windows has no `resource`; the CLI must still load and run its stages
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    try:
+        module = importlib.reload(cli)
+        pipeline = module.Pipeline()
+        assert pipeline.run('noop', lambda: 42) == 42
+        assert pipeline.stages[0]['peak_rss_mb'] is None
+        assert 'peak RSS' not in capsys.readouterr().out
+    finally:
+        monkeypatch.undo()
+        importlib.reload(cli)
+
+
+def test_full_run_scores_optimizes_and_plans_rotation(tmp_path):
+    csv = tmp_path / 'employees.csv'
+    pd.read_csv(os.path.join(ROOT, 'data', 'advanced_hr_data.csv'), nrows=300).to_csv(csv, index=False)
+    metrics = tmp_path / 'metrics.json'
+    code = cli.main(['--db', str(tmp_path / 'shiftsync.db'), '--csv', str(csv), '--model-dir',
+                     os.path.join(ROOT, 'src'), '--no-report', '--workers', '1', '--json', str(metrics),
+                     '--rotation', str(tmp_path / 'rotation.csv'), '--weeks', '2'])
+    assert code == cli.EXIT_OK
+    stages = json.load(open(metrics))['stages']
+    assert [s['stage'] for s in stages] == ['init', 'ingest', 'load', 'fatigue', 'artifacts', 'score',
+                                            'predictions', 'optimize', 'rotation']
+    assert all(s['status'] == 'ok' for s in stages)
+    rotation = pd.read_csv(tmp_path / 'rotation.csv')
+    assert sorted(rotation['Week'].unique()) == [1, 2] and len(rotation) == 2 * 300
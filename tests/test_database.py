@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from database import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    return Database(str(tmp_path / 'shiftsync.db'))
+
+
+def predictions(ids, prob):
+    prob = np.asarray(prob, dtype=float)
+    return pd.DataFrame({'Employee_ID': [str(i) for i in ids], 'Probability': prob,
+                         'Attrition_Risk': np.where(prob > 0.6, 'High', 'Low')})
+
+
+def staging_tables(db):
+    with db.pool.connection() as conn:
+        return [r[0] for r in conn.execute("SELECT name FROM sqlite_master "
+                                           "WHERE type = 'table' AND name LIKE 'predictions_staging%'")]
+
+
+def test_concurrent_full_rescores_stage_separately(db):
+    db.save_predictions(predictions(['old'], [0.5]))
+    first, second = db.stage_predictions('job1'), db.stage_predictions('job2')
+    assert first != second
+
+    # Interleaved chunks from two runs
+    db.save_predictions(predictions(['a', 'b'], [0.1, 0.2]), mode='stage', staging=first)
+    db.save_predictions(predictions(['x'], [0.9]), mode='stage', staging=second)
+    db.save_predictions(predictions(['c'], [0.3]), mode='stage', staging=first)
+
+    db.publish_predictions(first)
+    assert sorted(db.get_predictions()['Employee_ID']) == ['a', 'b', 'c']
+
+    db.save_predictions(predictions(['y'], [0.8]), mode='stage', staging=second)
+    db.publish_predictions(second)
+    assert sorted(db.get_predictions()['Employee_ID']) == ['x', 'y']
+    assert staging_tables(db) == []
+
+
+def test_discard_keeps_live_predictions(db):
+    db.save_predictions(predictions(['old'], [0.5]))
+    staging = db.stage_predictions()
+    db.save_predictions(predictions(['new'], [0.1]), mode='stage', staging=staging)
+    db.discard_staged_predictions(staging)
+    assert db.get_predictions()['Employee_ID'].tolist() == ['old']
+    assert staging_tables(db) == []
+
+
+def test_staging_names_are_validated(db):
+    with pytest.raises(ValueError):
+        db.publish_predictions('predictions; DROP TABLE employees')
+    with pytest.raises(ValueError):
+        db.save_predictions(predictions(['a'], [0.1]), mode='stage')
+
+
+def employees(ids, overtime):
+    return pd.DataFrame({'Employee_ID': ids, 'Age': 30, 'Department': 'Logistics', 'Shift_Type': 'Night',
+                         'Overtime_Hours': overtime})
+
+
+def test_upsert_counts_inserted_updated_unchanged(db):
+    assert db.save_employees(employees(['E1', 'E2', 'E3'], [1, 2, 3]), mode='upsert', batch_size=2) == \
+        {'inserted': 3, 'updated': 0, 'unchanged': 0}
+    version = db.get_versions()['employees']
+
+    # Same data again: nothing written, version and last_updated untouched
+    stamps = db.get_employees().set_index('Employee_ID')['last_updated']
+    assert db.save_employees(employees(['E1', 'E2', 'E3'], [1, 2, 3]), mode='upsert', batch_size=2) == \
+        {'inserted': 0, 'updated': 0, 'unchanged': 3}
+    assert db.get_versions()['employees'] == version
+    assert db.get_employees().set_index('Employee_ID')['last_updated'].equals(stamps)
+
+    # One changed, one new, one unchanged, across batch boundaries
+    assert db.save_employees(employees(['E1', 'E2', 'E4'], [1, 9, 4]), mode='upsert', batch_size=2) == \
+        {'inserted': 1, 'updated': 1, 'unchanged': 1}
+    assert db.get_versions()['employees'] == version + 1
+    stored = db.get_employees().set_index('Employee_ID')
+    assert stored['Overtime_Hours'].to_dict() == {'E1': 1, 'E2': 9, 'E3': 3, 'E4': 4}
+    assert stored.loc['E1', 'last_updated'] == stamps['E1']
+
+
+def test_upsert_repeated_id_in_one_upload_keeps_the_last(db):
+    counts = db.save_employees(employees(['E1', 'E1', 'E2'], [1, 5, 2]), mode='upsert')
+    assert counts == {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    assert db.get_employees().set_index('Employee_ID')['Overtime_Hours'].to_dict() == {'E1': 5, 'E2': 2}
+
+
+def walk(fetch, limit):
+    pages, after = [], None
+    while True:
+        page, after = fetch(after, limit)
+        assert len(page) <= limit
+        pages.append(page)
+        if after is None:
+            return pd.concat(pages, ignore_index=True)
+
+
+@pytest.fixture
+def registry(db):
+    ids = [f"E{i}" for i in range(23)]
+    db.save_employees(pd.DataFrame({'Employee_ID': ids, 'Department': ['Logistics', 'Quality'] * 11 + ['Logistics'],
+                                    'Shift_Type': 'Night', 'Overtime_Hours': 4}), mode='upsert')
+    # Only four distinct probabilities, so every page boundary falls inside a tie
+    prob = [[0.9, 0.7, 0.5, 0.2][i % 4] for i in range(23)]
+    db.save_predictions(predictions(ids, prob))
+    return db
+
+
+@pytest.mark.parametrize('limit', [1, 3, 5, 50])
+@pytest.mark.parametrize('filters', [None, {'Attrition_Risk': ['Low']}, {'Department': 'Quality'}])
+def test_page_predictions_is_stable_across_ties(registry, limit, filters):
+    pages = walk(lambda after, n: registry.page_predictions(filters, after, n), limit)
+    full = registry.get_predictions().merge(registry.get_employees(), on='Employee_ID')
+    if filters:
+        col, value = next(iter(filters.items()))
+        full = full[full[col].isin(value if isinstance(value, list) else [value])]
+    expected = full.sort_values(['Probability', 'Employee_ID'], ascending=False)['Employee_ID'].tolist()
+    assert pages['Employee_ID'].tolist() == expected
+    assert len(expected) == registry.count_predictions(filters)
+
+
+@pytest.mark.parametrize('limit', [1, 4, 50])
+def test_page_employees_walks_every_id_once(registry, limit):
+    pages = walk(lambda after, n: registry.page_employees({'Department': 'Logistics'}, after, n,
+                                                         columns=['Department']), limit)
+    expected = sorted(registry.get_employees(filters={'Department': 'Logistics'})['Employee_ID'])
+    assert pages['Employee_ID'].tolist() == expected
+    assert list(pages.columns) == ['Employee_ID', 'Department']
+    assert registry.count_employees({'Department': 'Logistics'}) == len(expected)
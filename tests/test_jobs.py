@@ -0,0 +1,51 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import jobs
+from database import Database
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / 'shiftsync.db'))
+    df = pd.read_csv(os.path.join(ROOT, 'data', 'advanced_hr_data.csv'), nrows=200)
+    db.save_employees(df, mode="upsert")
+    prob = np.random.default_rng(5).uniform(0, 1, len(df))
+    db.save_predictions(pd.DataFrame({'Employee_ID': df['Employee_ID'].astype(str), 'Probability': prob,
+                                      'Attrition_Risk': np.where(prob > 0.6, 'High', 'Low')}))
+    return db
+
+
+def enqueue(db, kind, params):
+    with db.pool.transaction() as conn:
+        return conn.execute("INSERT INTO jobs (kind, params, input_hash, status, submitted_at) "
+                            "VALUES (?, ?, ?, 'queued', ?)",
+                            (kind, json.dumps(params), kind, jobs._now())).lastrowid
+
+
+def run(db, tmp_path, kind, params):
+    enqueue(db, kind, params)
+    job = jobs.claim_job(db, os.getpid())
+    jobs.run_job(db, job[0], job[1], job[2], str(tmp_path), os.path.join(ROOT, 'src'))
+    with db.pool.connection() as conn:
+        return conn.execute("SELECT status, result, error FROM jobs WHERE id = ?", (job[0],)).fetchone()
+
+
+def test_solver_report_round_trips_as_numbers(db, tmp_path):
+    status, result, error = run(db, tmp_path, 'optimize', {'engine': 'solver'})
+    assert status == 'done', error
+    report = json.loads(result)['solver_report']
+    assert all(isinstance(v, float) for r in report for v in r['coverage_shortfall'])
+
+
+def test_non_json_result_fails_the_job(db, tmp_path, monkeypatch):
+    monkeypatch.setitem(jobs.TASKS, 'optimize', lambda ctx, params: ({'shortfall': np.zeros(3)}, None))
+    status, result, error = run(db, tmp_path, 'optimize', {})
+    assert status == 'failed' and result is None
+    assert error.startswith('TypeError')
@@ -0,0 +1,53 @@
+import sqlite3
+
+import pandas as pd
+
+from database import Database
+from migrations import LATEST
+
+
+def legacy_db(path):
+    # The pre-migration layout: no schema_version, and a predictions table
+    # rewritten by to_sql(if_exists='replace') without its key, with repeats
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, "
+                 "password TEXT, role TEXT)")
+    conn.execute("CREATE TABLE employees (Employee_ID TEXT PRIMARY KEY, Age INTEGER, Department TEXT, "
+                 "Shift_Type TEXT, Overtime_Hours INTEGER, Fatigue_Score REAL, last_updated TIMESTAMP)")
+    conn.executemany("INSERT INTO employees (Employee_ID, Age, Department, Shift_Type, Overtime_Hours, "
+                     "Fatigue_Score) VALUES (?, ?, ?, ?, ?, ?)",
+                     [('E1', 30, 'Logistics', 'Night', 12, 80.5), ('E2', 45, 'Quality', 'Morning', 2, 20.0)])
+    pd.DataFrame({'Employee_ID': ['E1', 'E2', 'E1'], 'Attrition_Risk': ['Low', 'High', 'Medium'],
+                  'Probability': [0.1, 0.7, 0.4]}).to_sql('predictions', conn, index=False)
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_migrates_to_latest(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    legacy_db(path)
+    db = Database(path)
+
+    with db.pool.connection() as conn:
+        versions = [r[0] for r in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        columns = {r[1]: r[5] for r in conn.execute("PRAGMA table_info(predictions)")}
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert versions == list(range(1, LATEST + 1))
+    # Declared schema: Employee_ID key plus the incremental-scoring columns
+    assert columns['Employee_ID'] == 1 and {'Feature_Hash', 'Scored_At'} <= set(columns)
+    assert {'idx_predictions_risk', 'idx_employees_shift', 'idx_jobs_status'} <= indexes
+    assert not {'idx_employees_id_ot_fatigue', 'idx_predictions_id_risk'} & indexes
+
+    # Latest row per employee survives; employees are untouched
+    preds = db.get_predictions().set_index('Employee_ID')
+    assert preds['Attrition_Risk'].to_dict() == {'E1': 'Medium', 'E2': 'High'}
+    assert sorted(db.get_employees()['Employee_ID']) == ['E1', 'E2']
+    assert db.get_versions() == {'employees': 0, 'predictions': 0}
+
+
+def test_migrations_run_once(tmp_path):
+    path = str(tmp_path / 'shiftsync.db')
+    Database(path)
+    Database(path)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == LATEST
@@ -0,0 +1,141 @@
+import os
+import shutil
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+import model
+from model import Model, ModelRegistry
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    for filename in Model.ARTIFACTS.values():
+        shutil.copy(os.path.join(ROOT, 'src', filename), tmp_path / filename)
+    yield tmp_path
+    ModelRegistry.clear()
+
+
+def test_failed_load_is_cached_and_reported_once(model_dir, capsys, monkeypatch):
+    os.remove(model_dir / 'adv_scaler.pkl')
+    loads = []
+    real_load = model.joblib.load
+    monkeypatch.setattr(model.joblib, 'load', lambda path, **kw: loads.append(path) or real_load(path, **kw))
+
+    ai = Model(str(model_dir))
+    assert ai.scaler is None
+    assert ai.scaler is None
+    assert Model(str(model_dir)).scaler is None
+    assert len(loads) == 1
+    assert capsys.readouterr().out.count("Error loading models") == 1
+
+
+def test_missing_artifacts_and_ensure_loaded(model_dir):
+    assert Model(str(model_dir)).missing_artifacts() == []
+    assert len(Model(str(model_dir)).ensure_loaded()) >= len(Model.ARTIFACTS)
+
+    os.remove(model_dir / 'adv_encoders.pkl')
+    ModelRegistry.clear()
+    ai = Model(str(model_dir))
+    assert ai.missing_artifacts() == ['encoders']
+    with pytest.raises(FileNotFoundError, match="encoders"):
+        ai.ensure_loaded()
+
+
+def write_artifacts(path, scaler):
+    # A two-feature model: one categorical code column and one numeric column
+    encoder = LabelEncoder().fit(['10', '20', '30'])
+    X = np.column_stack([encoder.transform(['10', '20', '30', '20']), [1.5, 4.0, 9.0, 2.5]])
+    scaler.fit(X)
+    clf = LogisticRegression().fit(scaler.transform(X), [0, 1, 1, 0])
+    for name, value in {'clf': clf, 'scaler': scaler, 'encoders': {'Code': encoder},
+                        'importance': None, 'feature_names': ['Code', 'Hours']}.items():
+        joblib.dump(value, path / Model.ARTIFACTS[name])
+    return encoder
+
+
+@pytest.mark.parametrize('scaler', [
+    StandardScaler(), StandardScaler(with_mean=False), StandardScaler(with_std=False),
+    StandardScaler(with_mean=False, with_std=False),
+], ids=['both', 'no-mean', 'no-std', 'neither'])
+def test_feature_matrix_matches_scaler_transform(tmp_path, scaler):
+    encoder = write_artifacts(tmp_path, scaler)
+    df = pd.DataFrame({'Code': ['30', '10', '20'], 'Hours': [3.0, 7.5, 0.0]})
+    expected = scaler.transform(np.column_stack([encoder.transform(df['Code']), df['Hours']]))
+    try:
+        np.testing.assert_array_equal(Model(str(tmp_path)).feature_matrix(df), expected.astype(np.float32))
+    finally:
+        ModelRegistry.clear()
+
+
+@pytest.mark.parametrize('codes', [
+    pd.Series([30, 10, 20]),                   # int64
+    pd.Series([30, 10, '20'], dtype=object),   # mixed object
+], ids=['int', 'object'])
+def test_encode_compares_labels_as_str(tmp_path, codes):
+    encoder = write_artifacts(tmp_path, StandardScaler())
+    df = pd.DataFrame({'Code': codes, 'Hours': [3.0, 7.5, 0.0]})
+    try:
+        X = Model(str(tmp_path)).encode(df)
+    finally:
+        ModelRegistry.clear()
+    np.testing.assert_array_equal(X[:, 0], encoder.transform(codes.astype(str)))
+
+
+# --- Incremental re-scoring ---
+
+@pytest.fixture
+def scored(tmp_path):
+    from database import Database
+    from ingest import score_fatigue
+    db = Database(str(tmp_path / 'shiftsync.db'))
+    df = score_fatigue(pd.read_csv(os.path.join(ROOT, 'data', 'advanced_hr_data.csv'), nrows=50))
+    ai = Model(os.path.join(ROOT, 'src'))
+    db.save_predictions(ai.predict_attrition(df, with_hash=True), mode="upsert")
+    return ai, db, df
+
+
+def test_changed_mask_flags_only_changed_rows(scored):
+    ai, db, df = scored
+    state = db.get_prediction_state()
+    assert not ai.changed_mask(df, state).any()
+
+    edited = df.copy()
+    edited.loc[3, 'Overtime_Hours'] += 5                       # feature change
+    edited.loc[7, 'Department'] = 'Quality' if df.loc[7, 'Department'] != 'Quality' else 'Logistics'
+    new = edited.iloc[:1].assign(Employee_ID='NEW-1')           # never scored
+    edited = pd.concat([edited, new], ignore_index=True)
+    assert np.flatnonzero(ai.changed_mask(edited, state)).tolist() == [3, 7, len(df)]
+
+
+def test_changed_mask_rescores_rows_updated_after_scoring(scored):
+    ai, db, df = scored
+    state = db.get_prediction_state()
+    touched = df.assign(last_updated=pd.Timestamp('2000-01-01'))
+    touched.loc[4, 'last_updated'] = pd.Timestamp.now() + pd.Timedelta(days=1)
+    assert np.flatnonzero(ai.changed_mask(touched, state)).tolist() == [4]
+
+    # Rows scored before hashing existed (NULL hash) are always re-scored
+    state.loc[state['Employee_ID'] == str(df.loc[9, 'Employee_ID']), 'Feature_Hash'] = 0
+    assert np.flatnonzero(ai.changed_mask(df, state)).tolist() == [9]
+
+
+def test_predict_incremental_scores_only_the_delta(scored):
+    ai, db, df = scored
+    edited = df.copy()
+    edited.loc[[2, 5], 'Overtime_Hours'] += 10
+    delta = ai.predict_incremental(edited, db.get_prediction_state())
+    assert delta['Employee_ID'].tolist() == df.loc[[2, 5], 'Employee_ID'].tolist()
+    expected = ai.predict_attrition(edited.loc[[2, 5]])
+    np.testing.assert_array_equal(delta['Probability'].to_numpy(), expected['Probability'].to_numpy())
+
+    db.save_predictions(delta, mode="upsert")
+    chunks = []
+    assert ai.predict_incremental(edited, db.get_prediction_state(), on_chunk=chunks.append) == 0
+    assert chunks == []
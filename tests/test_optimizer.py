@@ -0,0 +1,181 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import score_fatigue
+from optimizer import Optimizer
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+from advanced_optimizer import advanced_optimize_shifts  # noqa: E402
+
+
+def reference_fatigue(row):
+    # The original per-row formula, with Python's round()
+    ot_val = (row['Overtime_Hours'] / 40) * 40
+    night_val = 25 if row['Shift_Type'] == 'Night' else 0
+    commute_val = (row['Distance_km'] / 50) * 15
+    age_val = ((60 - row['Age']) / 40) * 10
+    leave_val = (row['Last_Month_Leave'] / 10) * 10
+    score = ot_val + night_val + commute_val + age_val + leave_val
+    return min(round(score, 2), 100)
+
+
+def roster(overtime):
+    rng = np.random.default_rng(7)
+    n = len(overtime)
+    return pd.DataFrame({
+        'Overtime_Hours': overtime,
+        'Shift_Type': rng.choice(['Morning', 'Evening', 'Night'], n),
+        'Distance_km': rng.integers(1, 50, n),
+        'Age': rng.integers(18, 60, n),
+        'Last_Month_Leave': rng.integers(0, 10, n),
+    })
+
+
+@pytest.mark.parametrize('overtime', [
+    np.random.default_rng(1).integers(0, 60, 500),                    # int hours
+    np.round(np.random.default_rng(2).uniform(0, 60, 500), 3),        # float hours
+    np.arange(0, 500) * 0.005 + 0.125,                                 # half-cent ties
+], ids=['int', 'float', 'ties'])
+def test_batch_matches_row_wise(overtime):
+    df = roster(overtime)
+    batch = Optimizer.calculate_fatigue_batch(df)
+    row_wise = df.apply(Optimizer.calculate_fatigue, axis=1)
+    reference = df.apply(reference_fatigue, axis=1)
+
+    assert batch.index.equals(df.index)
+    np.testing.assert_array_equal(batch.to_numpy(), row_wise.to_numpy())
+    np.testing.assert_array_equal(batch.to_numpy(), reference.to_numpy())
+
+
+def test_ties_are_exercised():
+    # Guard for the tie case above: some scores must sit exactly on a half-cent
+    df = roster(np.arange(0, 500) * 0.005 + 0.125)
+    raw = (df['Overtime_Hours'] + np.where(df['Shift_Type'] == 'Night', 25, 0)
+           + df['Distance_km'] / 50 * 15 + (60 - df['Age']) / 40 * 10 + df['Last_Month_Leave'])
+    scaled = raw.to_numpy() * 100
+    assert (np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6).any()
+
+
+def test_capped_at_100():
+    df = pd.DataFrame({'Overtime_Hours': [90], 'Shift_Type': ['Night'], 'Distance_km': [49],
+                       'Age': [18], 'Last_Month_Leave': [9]})
+    assert Optimizer.calculate_fatigue_batch(df).iloc[0] == 100
+    assert Optimizer.calculate_fatigue(df.iloc[0]) == 100
+
+
+# --- Rule engine parity with the original iterrows loops ---
+
+def reference_run_optimization(df, predictions):
+    # The original row-wise engine (predictions aligned by position)
+    merged = df.copy()
+    merged['Attrition_Risk'] = predictions['Attrition_Risk']
+    recommends = []
+    for _, row in merged.iterrows():
+        rec_shift, rec_ot, action = row['Shift_Type'], row['Overtime_Hours'], "Maintained"
+        if row['Fatigue_Score'] > 75:
+            if row['Shift_Type'] == 'Night':
+                rec_shift, action = 'Morning', "Rotated to Morning"
+            if row['Overtime_Hours'] > 8:
+                rec_ot = 8
+                action += " | Capped OT 8h"
+        elif row['Attrition_Risk'] == 'High':
+            if row['Overtime_Hours'] > 10:
+                rec_ot, action = 10, "Risk Cap applied"
+        recommends.append({'Employee_ID': row['Employee_ID'], 'Fatigue': row['Fatigue_Score'],
+                           'Risk': row['Attrition_Risk'], 'Current_Shift': row['Shift_Type'],
+                           'Optimal_Shift': rec_shift, 'Current_OT': row['Overtime_Hours'],
+                           'Optimal_OT': rec_ot, 'Action': action})
+    return pd.DataFrame(recommends)
+
+
+def reference_advanced_optimize(df, risk_probs):
+    recommendations = []
+    for i, row in df.assign(Risk_Probability=risk_probs).iterrows():
+        action, new_shift, new_ot = "Keep Current", row['Shift_Type'], row['Overtime_Hours']
+        if row['Fatigue_Score'] > 75 or row['Risk_Probability'] > 0.4:
+            if row['Shift_Type'] == 'Night':
+                new_shift, action = 'Morning', "Rotate to Morning"
+            if row['Overtime_Hours'] > 8:
+                new_ot = 8
+                action += " | Cap OT at 8h"
+        elif row['Fatigue_Score'] > 60:
+            if row['Overtime_Hours'] > 12:
+                new_ot, action = 12, "Cap OT at 12h"
+        recommendations.append({'Employee_ID': row['Employee_ID'], 'Department': row['Department'],
+                                'Fatigue': row['Fatigue_Score'], 'Current_Shift': row['Shift_Type'],
+                                'Suggested_Shift': new_shift, 'Original_OT': row['Overtime_Hours'],
+                                'Suggested_OT': new_ot, 'Action': action})
+    return pd.DataFrame(recommendations)
+
+
+@pytest.fixture(scope='module')
+def sample():
+    df = score_fatigue(pd.read_csv(os.path.join(ROOT, 'data', 'advanced_hr_data.csv')))
+    # The sample has no tired night worker under the OT cap nor a tired day
+    # worker over it; add one of each so every rule branch runs
+    extra = df.iloc[:2].copy()
+    extra['Employee_ID'] = ['EXTRA-1', 'EXTRA-2']
+    extra[['Fatigue_Score', 'Shift_Type', 'Overtime_Hours']] = [[80.0, 'Night', 5], [80.0, 'Morning', 12]]
+    df = pd.concat([df, extra], ignore_index=True)
+    prob = np.random.default_rng(9).uniform(0, 1, len(df))
+    preds = pd.DataFrame({'Employee_ID': df['Employee_ID'], 'Probability': prob,
+                          'Attrition_Risk': np.select([prob > 0.6, prob > 0.3], ['High', 'Medium'], 'Low')})
+    return df, preds
+
+
+def assert_same_frame(result, expected):
+    assert list(result.columns) == list(expected.columns)
+    for col in expected.columns:
+        np.testing.assert_array_equal(result[col].to_numpy(dtype=object), expected[col].to_numpy(dtype=object),
+                                      err_msg=col)
+
+
+def test_run_optimization_matches_row_wise_rules(sample):
+    df, preds = sample
+    result = Optimizer.run_optimization(df, preds)
+    assert_same_frame(result, reference_run_optimization(df, preds))
+
+    # Every branch is exercised: Night -> Morning, fatigue OT cut, risk OT cut, untouched
+    actions = set(result['Action'])
+    assert {"Rotated to Morning", "Rotated to Morning | Capped OT 8h", "Maintained | Capped OT 8h",
+            "Risk Cap applied", "Maintained"} <= actions
+
+
+def test_advanced_optimize_matches_row_wise_rules(sample):
+    df, preds = sample
+    result = advanced_optimize_shifts(df, preds['Probability'].to_numpy())
+    assert_same_frame(result, reference_advanced_optimize(df, preds['Probability'].to_numpy()))
+    assert {"Rotate to Morning | Cap OT at 8h", "Keep Current | Cap OT at 8h", "Cap OT at 12h"} <= set(result['Action'])
+
+
+# --- Keyed prediction join ---
+
+def test_join_predictions_aligns_by_id_and_reports_gaps():
+    df = pd.DataFrame({'Employee_ID': [101, 102, 103, 104], 'Shift_Type': ['Night'] * 4})
+    predictions = pd.DataFrame({
+        # Shuffled, a repeated ID (last write wins), string keys and one ex-employee
+        'Employee_ID': ['103', '101', '999', '101'],
+        'Attrition_Risk': ['High', 'Low', 'Medium', 'Medium'],
+        'Probability': [0.9, 0.1, 0.5, 0.4],
+    })
+    merged, report = Optimizer.join_predictions(df, predictions, columns=('Attrition_Risk', 'Probability'))
+
+    assert merged['Employee_ID'].tolist() == [101, 102, 103, 104]
+    assert merged['Attrition_Risk'].isna().tolist() == [False, True, False, True]
+    assert merged['Attrition_Risk'].dropna().tolist() == ['Medium', 'High']
+    assert merged['Probability'].dropna().tolist() == [0.4, 0.9]
+    assert report == {'matched': 2, 'unmatched': ['102', '104'], 'stale': ['999']}
+
+
+def test_run_optimization_leaves_unmatched_employees_unrisked():
+    df = pd.DataFrame({'Employee_ID': ['A', 'B'], 'Fatigue_Score': [10.0, 10.0],
+                       'Shift_Type': ['Night', 'Night'], 'Overtime_Hours': [20, 20]})
+    predictions = pd.DataFrame({'Employee_ID': ['B'], 'Attrition_Risk': ['High']})
+    result = Optimizer.run_optimization(df, predictions)
+    assert result['Action'].tolist() == ['Maintained', 'Risk Cap applied']
+    assert result.attrs['join_report']['unmatched'] == ['A']
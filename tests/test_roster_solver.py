@@ -0,0 +1,58 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import score_fatigue
+from roster_solver import RosterSolver
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+@pytest.fixture(scope='module')
+def workforce():
+    df = score_fatigue(pd.read_csv(os.path.join(ROOT, 'data', 'advanced_hr_data.csv'), nrows=300))
+    prob = np.random.default_rng(3).uniform(0, 1, len(df))
+    preds = pd.DataFrame({'Employee_ID': df['Employee_ID'], 'Probability': prob,
+                          'Attrition_Risk': np.select([prob > 0.6, prob > 0.3], ['High', 'Medium'], 'Low')})
+    return df, preds
+
+
+def test_default_never_raises_overtime(workforce):
+    result = RosterSolver().solve(*workforce)
+    assert (result['Optimal_OT'] <= result['Current_OT'] + 1e-9).all()
+    # Only the fatigue/risk caps cut hours
+    cut = result['Optimal_OT'] < result['Current_OT'] - 0.01
+    assert ((result['Fatigue'] > 75) | (result['Risk'] == 'High'))[cut].all()
+
+
+def test_explicit_ceiling_redistributes_hours(workforce):
+    result = RosterSolver(max_ot=16).solve(*workforce)
+    assert result['Optimal_OT'].max() <= 16
+    assert (result['Optimal_OT'] > result['Current_OT'] + 0.01).any()
+
+
+def test_rows_outside_every_department_keep_their_roster(workforce):
+    df, preds = workforce
+    df = df.copy()
+    df.loc[:9, 'Department'] = np.nan
+    result = RosterSolver().solve(df, preds).iloc[:10]
+    assert (result['Optimal_Shift'] == result['Current_Shift']).all()
+    assert (result['Optimal_OT'] == result['Current_OT']).all()
+    assert (result['Action'] == 'Maintained').all()
+
+
+def test_projected_fatigue_shares_the_fatigue_scale(workforce):
+    result = RosterSolver().solve(*workforce)
+    kept = result['Action'] == 'Maintained'
+    np.testing.assert_allclose(result.loc[kept, 'Projected_Fatigue'], result.loc[kept, 'Fatigue'].clip(0, 100))
+    assert result['Projected_Fatigue'].between(0, 100).all()
+
+
+def test_reports_are_plain_json(workforce):
+    result = RosterSolver().solve(*workforce)
+    records = json.loads(json.dumps(result.attrs['solver_report'].to_dict('records')))
+    assert all(isinstance(v, float) for r in records for v in r['coverage_shortfall'])
+    assert result.attrs['join_report']['matched'] == len(result)
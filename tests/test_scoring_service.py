@@ -0,0 +1,121 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from ingest import score_fatigue
+from model import Model
+from optimizer import Optimizer
+from scoring_service import ScoringServer
+
+DATA = 'data/advanced_hr_data.csv'
+
+
+@pytest.fixture(scope='module')
+def server(request):
+    root = request.config.rootpath
+    # A long batch window makes concurrent requests coalesce reliably
+    srv = ScoringServer(('127.0.0.1', 0), str(root / 'src'), max_batch=64, max_wait_ms=50)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_port}", root
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture(scope='module')
+def records(server):
+    _, root = server
+    df = pd.read_csv(root / DATA, nrows=40).drop(columns=['Fatigue_Score', 'Attrition'])
+    return json.loads(df.to_json(orient='records'))
+
+
+def post(url, path, body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode()
+    req = urllib.request.Request(url + path, data, {'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return resp.status, json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def get(url, path):
+    with urllib.request.urlopen(url + path) as resp:
+        return resp.status, json.loads(resp.read())
+
+
+def test_predict_matches_model(server, records):
+    url, root = server
+    expected = Model(str(root / 'src')).predict_attrition(score_fatigue(pd.DataFrame(records)))
+
+    status, single = post(url, '/predict', records[0])
+    assert status == 200
+    assert single['Employee_ID'] == records[0]['Employee_ID']
+    assert single['Probability'] == round(float(expected['Probability'].iloc[0]), 4)
+    assert single['Attrition_Risk'] == expected['Attrition_Risk'].iloc[0]
+
+    status, body = post(url, '/predict', {'employees': records})
+    assert status == 200
+    got = [r['Probability'] for r in body['results']]
+    assert got == [round(float(p), 4) for p in expected['Probability']]
+
+
+def test_fatigue_matches_optimizer(server, records):
+    url, _ = server
+    status, body = post(url, '/fatigue', records[:5])
+    assert status == 200
+    assert [r['Fatigue_Score'] for r in body['results']] == \
+        [Optimizer.calculate_fatigue(r) for r in records[:5]]
+
+
+@pytest.mark.parametrize('payload', [
+    {'Age': 30},                                              # missing fields
+    'not an employee',                                        # wrong shape
+    [],                                                       # empty list
+])
+def test_invalid_payloads_are_400(server, payload):
+    url, _ = server
+    status, body = post(url, '/predict', payload)
+    assert status == 400
+    assert 'error' in body
+
+
+def test_bad_values_are_400(server, records):
+    url, _ = server
+    # Non-numeric input with Fatigue_Score omitted fails in the fatigue fill
+    assert post(url, '/predict', dict(records[0], Overtime_Hours='lots'))[0] == 400
+    assert post(url, '/predict', dict(records[0], Department='Space'))[0] == 400
+    assert post(url, '/fatigue', dict(records[0], Distance_km='far'))[0] == 400
+    assert post(url, '/predict', b'{not json')[0] == 400
+
+
+def test_unknown_path_is_404(server):
+    url, _ = server
+    assert post(url, '/nowhere', {})[0] == 404
+
+
+def test_concurrent_requests_coalesce_and_isolate_errors(server, records):
+    url, _ = server
+    bad = dict(records[1], Department='Space')
+    with ThreadPoolExecutor(16) as pool:
+        statuses = list(pool.map(lambda r: post(url, '/predict', r)[0], [bad] + records))
+    assert statuses == [400] + [200] * len(records)
+
+    status, metrics = get(url, '/metrics')
+    assert status == 200
+    assert metrics['batches']['max_size'] > 1
+    predict = metrics['endpoints']['/predict']
+    assert predict['p50_ms'] <= predict['p99_ms']
+    assert predict['errors'] >= 1
+
+
+def test_health_reports_warm_artifacts(server):
+    url, _ = server
+    status, body = get(url, '/health')
+    assert status == 200 and body['status'] == 'ok'
+    assert {a['artifact'] for a in body['artifacts']} >= {'adv_model.pkl', 'adv_scaler.pkl'}